@@ -0,0 +1,26 @@
+""" Load tests for the djangoapp endpoints.
+
+    Runs the Django server against local stand-ins of its downstream
+    services, so that results depend only on the code under test and the
+    configured downstream latency, and can be compared across commits.
+
+    Usage (from the server directory):
+        python -m benchmarks.run --concurrency 16 --requests 400 \\
+            --latency 0.02 --output bench.json
+
+    serialization.py measures the JSON backends of djangoapp/jsoncodec.py
+    alone, without a server (python -m benchmarks.serialization).
+
+Flow:
+    Benchmark: Measures the throughput and latency of djangoapp.
+
+    Flow:
+        1. Stand-ins (stubs.py): The backend, searchcars and sentiment
+           services are served from database/data/*.json and
+           carsInventory/data/car_records.json, with added latency.
+        2. Server (run.py): gunicorn is started with gunicorn.conf.py and the
+           downstream URLs of the stand-ins.
+        3. Load (run.py): Each scenario is driven at the set concurrency and
+           its latency percentiles and requests per second are written as
+           JSON.
+"""
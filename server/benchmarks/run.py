@@ -0,0 +1,334 @@
+""" Drives the djangoapp endpoints at a set concurrency and reports their
+    latency percentiles and throughput as JSON.
+
+    By default the stand-in services of stubs.py and a gunicorn server
+    (gunicorn.conf.py, on a free port) are started for the run and stopped
+    afterwards. With --target, an already running server is measured
+    instead; it must be configured with the downstream URLs printed at start.
+
+    The output holds one entry per scenario:
+        {"requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms",
+         "mean_ms", "max_ms"}
+    along with the commit and parameters of the run under "meta".
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from .stubs import SERVER_DIR, BackendStub, SearchcarsStub, SentimentStub
+
+SCENARIOS = ('get_cars', 'get_dealerships', 'get_dealer_reviews',
+             'get_inventory', 'login', 'add_review')
+
+BENCH_USER = "benchmark"
+BENCH_PASSWORD = "benchmark-password"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _login(session, base_url):
+    return session.post(base_url + "/djangoapp/login",
+                        json={"userName": BENCH_USER,
+                              "password": BENCH_PASSWORD})
+
+
+def _request(scenario, session, base_url, rng, dealer_ids):
+    """ Sends one request of a scenario.
+
+        Returns:
+            requests.Response: The response.
+    """
+    dealer_id = rng.choice(dealer_ids)
+    if scenario == 'get_cars':
+        return session.get(base_url + "/djangoapp/get_cars")
+    if scenario == 'get_dealerships':
+        return session.get(base_url + "/djangoapp/get_dealers/")
+    if scenario == 'get_dealer_reviews':
+        return session.get(
+            base_url + "/djangoapp/reviews/dealer/{}".format(dealer_id))
+    if scenario == 'get_inventory':
+        return session.get(
+            base_url + "/djangoapp/get_inventory/{}".format(dealer_id),
+            params={"year": rng.choice((2015, 2018, 2020, 2022))})
+    if scenario == 'login':
+        return _login(session, base_url)
+    if scenario == 'add_review':
+        return session.post(base_url + "/djangoapp/add_review", json={
+            "name": BENCH_USER,
+            "dealership": dealer_id,
+            "review": "Benchmark review {}".format(rng.randrange(10 ** 9)),
+            "purchase": True,
+            "purchase_date": "01/01/2024",
+            "car_make": "Audi",
+            "car_model": "A6",
+            "car_year": 2020,
+        })
+    raise ValueError("unknown scenario {}".format(scenario))
+
+
+def _failed(response):
+    # Views report errors in the "status" field of a 200 response
+    if response.status_code >= 400:
+        return True
+    try:
+        status = response.json().get('status')
+    except (ValueError, AttributeError):
+        return False
+    return isinstance(status, int) and status >= 400
+
+
+def percentile(values, fraction):
+    """ Returns the nearest-rank percentile of sorted values. """
+    if not values:
+        return None
+    rank = max(1, int(round(fraction * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+
+def run_scenario(scenario, base_url, concurrency, total, dealer_ids,
+                 seed=0, warmup=0):
+    """ Sends `total` requests of a scenario from `concurrency` threads.
+
+        Each thread has its own keep-alive session; for add_review it logs in
+        first. `warmup` requests per thread are sent and not measured.
+
+        Returns:
+            dict: The statistics of the scenario.
+    """
+    remaining = [total]
+    lock = threading.Lock()
+    latencies = []
+    errors = [0]
+
+    def worker(index):
+        rng = random.Random("{}:{}:{}".format(seed, scenario, index))
+        session = requests.Session()
+        try:
+            if scenario == 'add_review':
+                _login(session, base_url)
+            for _ in range(warmup):
+                _request(scenario, session, base_url, rng, dealer_ids)
+        except requests.RequestException:
+            pass
+        barrier.wait()
+        own = []
+        failed = 0
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            started = time.perf_counter()
+            try:
+                failed += _failed(_request(scenario, session, base_url,
+                                           rng, dealer_ids))
+            except requests.RequestException:
+                failed += 1
+            own.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    barrier = threading.Barrier(concurrency + 1)
+    threads = [threading.Thread(target=worker, args=(index,))
+               for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {"requests": len(latencies),
+            "errors": errors[0],
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": ms(percentile(latencies, 0.50)),
+            "p95_ms": ms(percentile(latencies, 0.95)),
+            "p99_ms": ms(percentile(latencies, 0.99)),
+            "mean_ms": ms(sum(latencies) / len(latencies)
+                          if latencies else None),
+            "max_ms": ms(latencies[-1] if latencies else None)}
+
+
+def _manage(*args, env=None):
+    subprocess.run([sys.executable, "manage.py", *args], cwd=SERVER_DIR,
+                   env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def start_server(env, port, workers, server_mode):
+    """ Prepares the database and starts gunicorn with gunicorn.conf.py.
+
+        The run gets a database and cache directories of its own in a
+        temporary directory, so the server's db.sqlite3 and cache/ are left
+        untouched.
+
+        Returns:
+            subprocess.Popen: The gunicorn process, once it answers.
+    """
+    run_dir = tempfile.mkdtemp(prefix='bench-')
+    env = dict(env, SERVER_MODE=server_mode,
+               GUNICORN_BIND="127.0.0.1:{}".format(port),
+               GUNICORN_WORKERS=str(workers),
+               SQLITE_PATH=os.path.join(run_dir, 'db.sqlite3'),
+               SHARED_CACHE_DIR=os.path.join(run_dir, 'cache', 'shared'),
+               SESSION_CACHE_DIR=os.path.join(run_dir, 'cache', 'sessions'),
+               SENTIMENT_CACHE_DIR=os.path.join(run_dir, 'cache',
+                                                'sentiment'),
+               PROMETHEUS_MULTIPROC_DIR=os.path.join(run_dir, 'metrics'))
+    _manage("migrate", "--noinput", env=env)
+    _manage("shell", "-c",
+            "from django.contrib.auth.models import User\n"
+            "User.objects.filter(username={0!r}).exists() or "
+            "User.objects.create_user({0!r}, password={1!r})".format(
+                BENCH_USER, BENCH_PASSWORD),
+            env=env)
+    # stderr is kept, so that a failed boot shows why
+    process = subprocess.Popen(["gunicorn", "-c", "gunicorn.conf.py"],
+                               cwd=SERVER_DIR, env=env,
+                               stdout=subprocess.DEVNULL)
+    base_url = "http://127.0.0.1:{}".format(port)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(base_url + "/djangoapp/get_cars", timeout=1)
+            return process
+        except requests.RequestException:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("gunicorn did not start")
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=SERVER_DIR,
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', default=",".join(SCENARIOS),
+                        help="Comma separated scenarios to run.")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200,
+                        help="Measured requests per scenario.")
+    parser.add_argument('--warmup', type=int, default=5,
+                        help="Unmeasured requests per thread first.")
+    parser.add_argument('--latency', type=float, default=0.01,
+                        help="Seconds added by every stand-in service.")
+    parser.add_argument('--backend-latency', type=float)
+    parser.add_argument('--searchcars-latency', type=float)
+    parser.add_argument('--sentiment-latency', type=float)
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help="Up to this many seconds are added at random.")
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--server-mode', choices=('wsgi', 'asgi'),
+                        default=os.getenv('SERVER_MODE', 'wsgi'))
+    parser.add_argument('--target',
+                        help="URL of a running server to measure instead.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="File to write; default stdout.")
+    args = parser.parse_args(argv)
+
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error("unknown scenario {}".format(name))
+
+    def latency(value):
+        return args.latency if value is None else value
+
+    stubs = {
+        'backend': BackendStub(latency=latency(args.backend_latency),
+                               jitter=args.jitter).start(),
+        'searchcars': SearchcarsStub(latency=latency(args.searchcars_latency),
+                                     jitter=args.jitter).start(),
+        'sentiment': SentimentStub(latency=latency(args.sentiment_latency),
+                                   jitter=args.jitter).start(),
+    }
+    env = dict(os.environ,
+               backend_url=stubs['backend'].url,
+               searchcars_url=stubs['searchcars'].url + "/",
+               sentiment_analyzer_url=stubs['sentiment'].url + "/",
+               ALLOWED_HOSTS="127.0.0.1,localhost")
+    for name in ('backend_url', 'searchcars_url', 'sentiment_analyzer_url'):
+        print("{}={}".format(name, env[name]), file=sys.stderr)
+
+    dealer_ids = sorted({review['dealership']
+                         for review in stubs['backend'].reviews})
+    process = None
+    try:
+        if args.target:
+            base_url = args.target.rstrip('/')
+        else:
+            port = _free_port()
+            process = start_server(env, port, args.workers,
+                                   args.server_mode)
+            base_url = "http://127.0.0.1:{}".format(port)
+        results = {}
+        for name in scenarios:
+            results[name] = run_scenario(name, base_url, args.concurrency,
+                                         args.requests, dealer_ids,
+                                         seed=args.seed, warmup=args.warmup)
+            print("{}: {}".format(name, results[name]), file=sys.stderr)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        for stub in stubs.values():
+            stub.stop()
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.datetime.now(
+                datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "target": args.target,
+            "server_mode": None if args.target else args.server_mode,
+            "workers": None if args.target else args.workers,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "latency": {name: stub.latency for name, stub in stubs.items()},
+            "jitter": args.jitter,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
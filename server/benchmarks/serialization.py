@@ -0,0 +1,141 @@
+""" Compares the JSON backends of djangoapp/jsoncodec.py on review payloads
+    and reports the time per operation as JSON.
+
+    Payloads are built like a `get_dealer_reviews` response: reviews from
+    database/data/reviews.json, repeated with fresh ids to the page sizes
+    measured, each with a "sentiment". For every backend and size:
+        decode: parsing the backend's response (`loads` of a review list).
+        encode: building the JsonResponse of the view.
+
+    Usage (from the server directory):
+        python -m benchmarks.serialization --sizes 20,100,500 \\
+            --output serialization.json
+
+    The output holds one entry per backend and size:
+        {"bytes", "decode_us", "encode_us"}
+    and, when both backends ran, the orjson speedup per size under
+    "speedup"; the commit and parameters of the run are under "meta".
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+import django
+
+from .run import _commit
+from .stubs import DATABASE_DATA, SENTIMENTS, _load
+
+BACKENDS = ('stdlib', 'orjson')
+
+
+def review_payload(size):
+    """ Returns `size` reviews with their sentiment, as the view sends them.
+    """
+    seed = _load(DATABASE_DATA / 'reviews.json', 'reviews')
+    reviews = []
+    for index in range(size):
+        review = dict(seed[index % len(seed)], id=index + 1)
+        review['sentiment'] = SENTIMENTS[index % len(SENTIMENTS)]
+        reviews.append(review)
+    return reviews
+
+
+def measure(function, repeat, number):
+    """ Returns the median time of one call of `function`, in microseconds.
+    """
+    times = timeit.repeat(function, repeat=repeat, number=number)
+    return round(statistics.median(times) / number * 1e6, 2)
+
+
+def run_backend(name, sizes, repeat, number):
+    """ Measures one backend.
+
+        Returns:
+            dict: The statistics of each size, keyed by size.
+    """
+    from djangoapp import jsoncodec
+
+    dumps, loads = jsoncodec.backend_functions(name)
+
+    def response(data):
+        # JsonResponse with the backend under test instead of the
+        # configured one
+        return jsoncodec.HttpResponse(dumps(data),
+                                      content_type='application/json')
+
+    results = {}
+    for size in sizes:
+        reviews = review_payload(size)
+        body = dumps(reviews)
+        page = {"status": 200, "reviews": reviews, "total": size,
+                "next_cursor": None}
+        results[str(size)] = {
+            "bytes": len(body),
+            "decode_us": measure(lambda: loads(body), repeat, number),
+            "encode_us": measure(lambda: response(page), repeat, number),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default="20,100,500",
+                        help="Comma separated numbers of reviews.")
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--number', type=int, default=200,
+                        help="Calls per timing.")
+    parser.add_argument('--output', help="File to write; default stdout.")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangoproj.settings')
+    django.setup()
+    from djangoapp import jsoncodec
+
+    backends = BACKENDS if jsoncodec.orjson else ('stdlib',)
+    if len(backends) < len(BACKENDS):
+        print("orjson is not installed; measuring stdlib only",
+              file=sys.stderr)
+    results = {}
+    for name in backends:
+        results[name] = run_backend(name, sizes, args.repeat, args.number)
+        print("{}: {}".format(name, results[name]), file=sys.stderr)
+
+    speedup = {}
+    if 'orjson' in results:
+        for size, stdlib in results['stdlib'].items():
+            fast = results['orjson'][size]
+            speedup[size] = {
+                operation: round(stdlib[operation] / fast[operation], 2)
+                for operation in ('decode_us', 'encode_us')}
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.datetime.now(
+                datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "orjson": getattr(jsoncodec.orjson, '__version__', None),
+            "sizes": sizes,
+            "repeat": args.repeat,
+            "number": args.number,
+        },
+        "results": results,
+        "speedup": speedup,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+""" Local stand-ins of the downstream services of djangoapp, for load tests.
+
+    Each stand-in is a threaded HTTP server that answers the endpoints
+    restapis.py calls, from the seed data of the real service, after
+    sleeping for a configurable latency:
+        backend: database/data/dealerships.json and reviews.json.
+        searchcars: carsInventory/data/car_records.json.
+        sentiment: a deterministic label per text (no model is loaded).
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+DATABASE_DATA = SERVER_DIR / 'database' / 'data'
+INVENTORY_DATA = SERVER_DIR / 'carsInventory' / 'data' / 'car_records.json'
+
+SENTIMENTS = ('positive', 'neutral', 'negative')
+RANGE_FIELDS = ('year', 'mileage', 'price')
+SORT_FIELDS = ('year', 'mileage', 'price', 'make', 'model')
+
+
+def _load(path, key):
+    with open(path) as f:
+        return json.load(f)[key]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """ Routes requests to the `routes` of the stand-in server, a list of
+        (method, compiled path pattern, handler) tuples.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        # restapis.py joins base URLs and endpoints with a doubled slash
+        path = '/' + unquote(url.path).lstrip('/')
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        self.server.sleep()
+        for route_method, pattern, handler in self.server.routes:
+            match = pattern.fullmatch(path)
+            if route_method == method and match:
+                status, payload = handler(parse_qs(url.query), body,
+                                          *match.groups())
+                break
+        else:
+            status, payload = 404, {"error": "Not found"}
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+
+class StubServer(ThreadingHTTPServer):
+    """ A stand-in service listening on localhost.
+
+        Args:
+            latency (float): Seconds added to every response.
+            jitter (float): Up to this many seconds are added at random.
+            port (int): The port, 0 for any free port.
+    """
+
+    daemon_threads = True
+    routes = ()
+
+    def __init__(self, latency=0.0, jitter=0.0, port=0):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+    def sleep(self):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class BackendStub(StubServer):
+    """ Stand-in of the Node dealership/review backend (database/app.js). """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.dealers = _load(DATABASE_DATA / 'dealerships.json',
+                             'dealerships')
+        self.reviews = _load(DATABASE_DATA / 'reviews.json', 'reviews')
+        self._lock = threading.Lock()
+        self.routes = [
+            ('GET', re.compile(r'/fetchDealers/?'), self.fetch_dealers),
+            ('GET', re.compile(r'/fetchDealers/([^/]+)'), self.fetch_dealers),
+            ('GET', re.compile(r'/fetchDealer/(\d+)'), self.fetch_dealer),
+            ('GET', re.compile(r'/fetchReviews'), self.fetch_reviews),
+            ('GET', re.compile(r'/fetchReviews/dealer/(\d+)'),
+             self.fetch_reviews),
+            ('POST', re.compile(r'/insert_review'), self.insert_review),
+        ]
+
+    def fetch_dealers(self, params, body, state=None):
+        if state is None:
+            return 200, self.dealers
+        return 200, [dealer for dealer in self.dealers
+                     if dealer['state'] == state]
+
+    def fetch_dealer(self, params, body, dealer_id):
+        return 200, [dealer for dealer in self.dealers
+                     if dealer['id'] == int(dealer_id)]
+
+    def fetch_reviews(self, params, body, dealer_id=None):
+        if dealer_id is None:
+            return 200, self.reviews
+        reviews = [review for review in self.reviews
+                   if review['dealership'] == int(dealer_id)]
+        if 'limit' not in params:
+            return 200, reviews
+        offset = int(params.get('offset', ['0'])[0])
+        limit = int(params['limit'][0])
+        return 200, {"total": len(reviews),
+                     "reviews": reviews[offset:offset + limit]}
+
+    def insert_review(self, params, body, *groups):
+        data = json.loads(body)
+        fields = ('name', 'dealership', 'review', 'purchase',
+                  'purchase_date', 'car_make', 'car_model', 'car_year')
+        with self._lock:
+            review = {"id": max(review['id'] for review in self.reviews) + 1}
+            review.update({field: data.get(field) for field in fields})
+            self.reviews.append(review)
+        return 200, review
+
+
+class SearchcarsStub(StubServer):
+    """ Stand-in of the carsInventory service (carsInventory/app.js). """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.cars = _load(INVENTORY_DATA, 'cars')
+        for index, car in enumerate(self.cars):
+            car.setdefault('_id', "{:024x}".format(index))
+        self.routes = [
+            ('GET', re.compile(r'/cars/(\d+)'), self.cars_by_dealer),
+            ('GET', re.compile(r'/carsearch/(\d+)'), self.car_search),
+        ]
+
+    def cars_by_dealer(self, params, body, dealer_id):
+        return 200, [car for car in self.cars
+                     if car['dealer_id'] == int(dealer_id)]
+
+    def car_search(self, params, body, dealer_id):
+        params = {name: values[0] for name, values in params.items()}
+        cars = [car for car in self.cars if car['dealer_id'] == int(dealer_id)]
+        for name, field in (('make', 'make'), ('model', 'model'),
+                            ('body_type', 'bodyType')):
+            if params.get(name):
+                cars = [car for car in cars if car[field] == params[name]]
+        for field in RANGE_FIELDS:
+            if 'min_' + field in params:
+                cars = [car for car in cars
+                        if car[field] >= int(params['min_' + field])]
+            if 'max_' + field in params:
+                cars = [car for car in cars
+                        if car[field] <= int(params['max_' + field])]
+        cars.sort(key=lambda car: car['_id'])
+        sort = [field for field in params.get('sort', '').split(',')
+                if field.lstrip('-') in SORT_FIELDS]
+        for field in reversed(sort):
+            cars.sort(key=lambda car: car[field.lstrip('-')],
+                      reverse=field.startswith('-'))
+        total = len(cars)
+        offset = int(params.get('offset') or 0)
+        cars = cars[offset:]
+        if params.get('limit'):
+            cars = cars[:int(params['limit'])]
+        return 200, {"total": total, "cars": cars}
+
+
+class SentimentStub(StubServer):
+    """ Stand-in of the sentiment analyzer (djangoapp/microservices). """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.routes = [
+            ('GET', re.compile(r'/analyze/(.*)', re.S), self.analyze),
+            ('POST', re.compile(r'/analyze_batch'), self.analyze_batch),
+        ]
+
+    @staticmethod
+    def classify(text):
+        digest = hashlib.md5(text.encode('utf-8')).digest()
+        return SENTIMENTS[digest[0] % len(SENTIMENTS)]
+
+    def analyze(self, params, body, text):
+        return 200, {"sentiment": self.classify(text)}
+
+    def analyze_batch(self, params, body, *groups):
+        texts = json.loads(body)
+        if not isinstance(texts, list):
+            return 400, {"error": "expected a list of texts"}
+        return 200, {"sentiments": [self.classify(text) for text in texts]}
@@ -123,6 +123,51 @@ app.get('/carsbyyear/:id/:year', async (req, res) => {
   }
 });
 
+/* Search a dealer's inventory with any combination of filters, e.g.
+   /carsearch/1?make=Toyota&min_year=2022&max_mileage=50000&sort=-year&limit=20
+   Range bounds (min_/max_ year, mileage, price) are inclusive. Responds with
+   the matching page of cars and the total number of matches. */
+const RANGE_FIELDS = ['year', 'mileage', 'price'];
+const SORT_FIELDS = ['year', 'mileage', 'price', 'make', 'model'];
+
+app.get('/carsearch/:id', async (req, res) => {
+  try {
+    const query = { dealer_id: parseInt(req.params.id) };
+    if (req.query.make) { query.make = req.query.make; }
+    if (req.query.model) { query.model = req.query.model; }
+    if (req.query.body_type) { query.bodyType = req.query.body_type; }
+    RANGE_FIELDS.forEach((field) => {
+      const condition = {};
+      if (req.query['min_' + field] !== undefined) {
+        condition.$gte = parseInt(req.query['min_' + field]);
+      }
+      if (req.query['max_' + field] !== undefined) {
+        condition.$lte = parseInt(req.query['max_' + field]);
+      }
+      if (Object.keys(condition).length > 0) { query[field] = condition; }
+    });
+
+    const sort = {};
+    (req.query.sort || '').split(',').filter(Boolean).forEach((field) => {
+      const name = field.replace(/^-/, '');
+      if (SORT_FIELDS.includes(name)) {
+        sort[name] = field.startsWith('-') ? -1 : 1;
+      }
+    });
+    sort._id = 1;
+
+    let cursor = Cars.find(query).sort(sort).skip(parseInt(req.query.offset) || 0);
+    if (req.query.limit) { cursor = cursor.limit(parseInt(req.query.limit)); }
+    const [cars, total] = await Promise.all([
+      cursor.lean(),
+      Cars.countDocuments(query),
+    ]);
+    res.json({ total: total, cars: cars });
+  } catch (error) {
+    res.status(500).json({ error: 'Error searching cars' });
+  }
+});
+
 app.listen(port, () => {
   console.log(`Server is running on http://localhost:${port}`);
 });
\ No newline at end of file
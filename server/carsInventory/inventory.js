@@ -34,4 +34,10 @@ price: {
   }
 });
 
+// Every search filters on dealer_id first; these back /carsearch/:id
+cars.index({ dealer_id: 1, make: 1, model: 1 });
+cars.index({ dealer_id: 1, year: 1 });
+cars.index({ dealer_id: 1, mileage: 1 });
+cars.index({ dealer_id: 1, price: 1 });
+
 module.exports = mongoose.model('cars', cars);
\ No newline at end of file
@@ -46,11 +46,24 @@ app.get('/fetchReviews', async (req, res) => {
   }
 });
 
-// Express route to fetch reviews by a particular dealer
+// Express route to fetch reviews by a particular dealer. With `limit` (and
+// `offset`), responds with one page of reviews, in insertion order, and the
+// dealer's number of reviews: { total, reviews }.
 app.get('/fetchReviews/dealer/:id', async (req, res) => {
   try {
-    const documents = await Reviews.find({dealership: req.params.id});
-    res.json(documents);
+    const query = {dealership: req.params.id};
+    if (req.query.limit === undefined) {
+      const documents = await Reviews.find(query);
+      res.json(documents);
+      return;
+    }
+    const [reviews, total] = await Promise.all([
+      Reviews.find(query).sort({_id: 1})
+        .skip(parseInt(req.query.offset) || 0)
+        .limit(parseInt(req.query.limit)).lean(),
+      Reviews.countDocuments(query),
+    ]);
+    res.json({ total: total, reviews: reviews });
   } catch (error) {
     res.status(500).json({ error: 'Error fetching documents' });
   }
@@ -14,7 +14,18 @@
 """
 
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class DjangoappConfig(AppConfig):
     name = 'djangoapp'
+
+    def ready(self):
+        # Connect the signal receivers and register the system checks
+        from . import checks, signals  # noqa: F401
+
+        if not settings.UPDATE_LAST_LOGIN:
+            # Logins then write nothing to the database (with signed cookie
+            # or cache sessions)
+            from django.contrib.auth.signals import user_logged_in
+            user_logged_in.disconnect(dispatch_uid='update_last_login')
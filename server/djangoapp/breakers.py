@@ -0,0 +1,157 @@
+""" Circuit breakers and request time budgets for downstream calls.
+
+    A circuit breaker counts consecutive failures of one downstream service.
+    Past a threshold it opens and calls fail immediately instead of waiting
+    on a service that is down or overloaded; after a cool-down it lets a few
+    probe calls through (half-open) and closes again once one succeeds.
+
+    A time budget bounds the total time one incoming request may spend
+    waiting on downstream services: each call gets at most the time left.
+
+Flow:
+    Downstream Protection: Decides whether, and for how long, a downstream
+    call may be made.
+
+    Flow:
+        1. Request (in middleware.py): A time budget is started for each
+           incoming request.
+        2. Downstream Call (in restapis.py): Before calling a service, the
+           breaker of that service is asked for permission and the remaining
+           budget caps the call's timeout.
+        > 3. Current File (breakers.py): The breaker state and the budget are
+             tracked here; the outcome of each call updates the breaker.
+        4. Fallback (in restapis.py / views.py): A refused call fails fast and
+           the view serves its fallback (None, "unknown" sentiment, ...).
+"""
+
+import contextvars
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """ Raised instead of calling a downstream whose breaker is open. """
+
+
+class BudgetExceededError(Exception):
+    """ Raised instead of calling a downstream when the request has no time
+        budget left.
+    """
+
+
+class CircuitBreaker:
+    """ A thread-safe circuit breaker for one downstream service.
+
+        Args:
+            name (str): Name of the downstream, for monitoring.
+            failure_threshold (int): Consecutive failures that open it.
+            reset_timeout (float): Seconds it stays open before probing.
+            half_open_max_calls (int): Probe calls allowed while half-open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30,
+                 half_open_max_calls=1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """ Returns True if a call may be made now. """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probes = 0
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def is_open(self):
+        """ Returns True while calls are refused without a probe. """
+        with self._lock:
+            return (self.state == self.OPEN and time.monotonic()
+                    - self.opened_at < self.reset_timeout)
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if (self.state == self.HALF_OPEN
+                    or self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """ Records a call that ended without an outcome (e.g. cancelled),
+            freeing its probe slot so the next call may probe instead.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def status(self):
+        """ Returns the breaker state as a dict for monitoring. """
+        with self._lock:
+            status = {"state": self.state,
+                      "failures": self.failures,
+                      "rejected": self.rejected,
+                      "retry_in": None}
+            if self.state == self.OPEN:
+                status["retry_in"] = max(
+                    0.0, self.reset_timeout
+                    - (time.monotonic() - self.opened_at))
+            return status
+
+
+# Monotonic deadline of the current request, None when unbounded
+_deadline = contextvars.ContextVar('downstream_deadline', default=None)
+
+
+def start_budget(seconds):
+    """ Starts a time budget for the current request (context).
+
+        Returns:
+            Token: Pass it to `end_budget` when the request is done.
+    """
+    return _deadline.set(time.monotonic() + seconds)
+
+
+def end_budget(token):
+    _deadline.reset(token)
+
+
+def remaining_budget():
+    """ Returns the seconds left in the current request's budget, or None if
+        no budget is running.
+
+        Raises:
+            BudgetExceededError: If the budget is used up.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise BudgetExceededError("request time budget exceeded")
+    return remaining
@@ -0,0 +1,176 @@
+""" In-process caching helpers shared by the djangoapp modules.
+
+    This module provides a small, thread-safe, bounded LRU cache with an
+    optional time-to-live, used to keep results of downstream calls (e.g.
+    sentiment analysis) in the memory of a worker process, and a
+    stale-while-revalidate cache for slowly changing backend reads (e.g. the
+    dealer listings).
+
+Flow:
+    Caching: Keeps recently used results close to the code that needs them.
+
+    Flow:
+        1. Lookup (in restapis.py / views.py): A function checks the cache
+           before calling an external service.
+        > 2. Current File (cache.py): The cache returns the stored value, or
+             records a miss if the key is absent or expired.
+        3. External Call: On a miss, the caller fetches the value and stores
+           it back into the cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """ A bounded least-recently-used cache with an optional TTL.
+
+        Args:
+            maxsize (int): Maximum number of entries kept. The least recently
+                used entry is evicted when the cache is full.
+            ttl (float, optional): Seconds an entry stays valid. None keeps
+                entries until they are evicted.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """ Returns the value stored for `key`, or `default` if it is absent
+            or expired. Counts a hit or a miss.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """ Stores `value` under `key`, evicting the oldest entry if full. """
+        expires = None
+        if self.ttl is not None:
+            expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """ Returns the hit/miss counters and current size as a dict. """
+        with self._lock:
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "size": len(self._data),
+                    "maxsize": self.maxsize}
+
+    def __len__(self):
+        return len(self._data)
+
+
+class StaleWhileRevalidateCache:
+    """ A cache of slowly changing downstream reads with stale-while-
+        revalidate semantics.
+
+        An entry is fresh for `ttl` seconds and is then served stale for up
+        to `stale_ttl` more seconds while a single background thread reloads
+        it. Past that, or on a first read, the value is loaded in the
+        caller's thread. A loader returning None (e.g. on a network error)
+        never replaces a cached value.
+
+        Args:
+            ttl (float): Seconds an entry is fresh.
+            stale_ttl (float): Seconds a stale entry may still be served.
+            on_refresh (callable, optional): Called as on_refresh(key, value)
+                after every successful load.
+    """
+
+    def __init__(self, ttl, stale_ttl, on_refresh=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.on_refresh = on_refresh
+        self._data = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """ Returns the value for `key`, calling `loader()` to load it when
+            there is no usable entry.
+        """
+        value = self.peek(key, loader)
+        if value is None:
+            value = self._load(key, loader)
+        return value
+
+    def peek(self, key, loader):
+        """ Returns the cached value for `key` without blocking on a load, or
+            None if there is no usable entry. A stale entry is returned and
+            reloaded in the background with `loader()`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, loaded_at = entry
+            if now - loaded_at < self.ttl:
+                return value
+            if now - loaded_at >= self.ttl + self.stale_ttl:
+                return None
+            if key in self._refreshing:
+                return value
+            self._refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key, loader),
+                         daemon=True).start()
+        return value
+
+    def set(self, key, value):
+        """ Stores a freshly loaded `value` under `key`. """
+        if value is None:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+        if self.on_refresh is not None:
+            self.on_refresh(key, value)
+
+    def invalidate(self, key=_MISSING):
+        """ Drops the entry for `key`, or every entry if no key is given. """
+        with self._lock:
+            if key is _MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def _load(self, key, loader):
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def _refresh(self, key, loader):
+        try:
+            self._load(key, loader)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
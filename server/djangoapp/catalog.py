@@ -0,0 +1,173 @@
+""" Builds and caches the serialized car catalog served by `get_cars`, and
+    searches it for `get_catalog`.
+
+    The catalog (every CarModel with its CarMake) changes only when car makes
+    or models are saved or deleted, so its JSON payload is built once, kept
+    in the shared Django cache with a strong ETag, and rebuilt after the
+    model signals in signals.py invalidate it.
+
+    Searches (by make, type, year range and model name prefix) run as one
+    indexed query (see the indexes of CarMake and CarModel) projected with
+    values(), so no model instances are created however large the catalog.
+
+Flow:
+    Catalog Payload: Serves the car make/model list without touching the
+    database on repeat requests.
+
+    Flow:
+        1. View Function Call (in views.py): `get_cars` asks for the payload.
+        > 2. Current File (catalog.py): The payload of the current catalog
+             generation is read from the cache, or built from the ORM and
+             stored.
+        3. Invalidation (in signals.py): Saving or deleting a CarMake or
+           CarModel starts a new generation, so the next request rebuilds.
+"""
+
+import hashlib
+import os
+
+from django.core.cache import caches
+from django.db.models import F
+from django.db.models.functions import Lower
+
+from .jsoncodec import dumps
+from .models import CarMake, CarModel
+
+# Cache alias visible to every worker, so an invalidation reaches them all
+CATALOG_CACHE_ALIAS = 'shared'
+
+_GENERATION_KEY = "cars:generation"
+_PAYLOAD_KEY = "cars:payload:{}"
+
+
+def _cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def build_car_models_payload():
+    """ Serializes every car model with its make.
+
+        Returns:
+            bytes: The JSON body {"CarModels": [{"CarModel", "CarMake"}]}.
+    """
+    car_models = CarModel.objects.select_related('car_make').order_by('pk')
+    cars = []
+    for car_model in car_models:
+        cars.append({"CarModel": car_model.name,
+                     "CarMake": car_model.car_make.name})
+    return dumps({"CarModels": cars})
+
+
+def car_models_payload():
+    """ Returns the cached catalog payload, building it on first use after
+        an invalidation.
+
+        Returns:
+            tuple: (body, etag) where body is the JSON payload as bytes and
+                etag a strong ETag (quoted) derived from its content.
+    """
+    cache = _cache()
+    generation = cache.get(_GENERATION_KEY, 0)
+    key = _PAYLOAD_KEY.format(generation)
+    cached = cache.get(key)
+    if cached is None:
+        # Built under the generation read above: if the catalog changes
+        # meanwhile, the new generation makes this entry unreachable.
+        body = build_car_models_payload()
+        etag = '"{}"'.format(hashlib.sha256(body).hexdigest()[:32])
+        cached = (body, etag)
+        cache.set(key, cached, timeout=None)
+    return cached
+
+
+def invalidate_car_models_payload():
+    """ Starts a new catalog generation so every worker rebuilds the
+        payload on its next request.
+    """
+    cache = _cache()
+    # A random generation rather than a counter: incr() is a plain get+set
+    # on the file-based cache, so concurrent invalidations could both write
+    # the same number and readers keep a payload built before the change.
+    # Random values never repeat, as with `restapis.invalidate_dealers`.
+    previous = cache.get(_GENERATION_KEY, 0)
+    cache.set(_GENERATION_KEY, os.urandom(8).hex(), timeout=None)
+    cache.delete(_PAYLOAD_KEY.format(previous))
+
+
+def _year_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError("{} must be an integer".format(name))
+
+
+def parse_catalog_query(params):
+    """ Builds a catalog search from request parameters.
+
+        Accepted parameters:
+            make: make name, case-insensitive.
+            type: car type (SEDAN, SUV or WAGON), case-insensitive.
+            min_year, max_year: inclusive year bounds.
+            q: prefix of the model name, case-insensitive.
+
+        Args:
+            params (QueryDict or dict): The request's query parameters.
+
+        Returns:
+            dict: The search, holding only the parameters that were set.
+
+        Raises:
+            ValueError: If a parameter is malformed.
+    """
+    query = {}
+    if params.get('make'):
+        query['make'] = params['make'].lower()
+    if params.get('type'):
+        car_type = params['type'].upper()
+        if car_type not in dict(CarModel.CAR_TYPES):
+            raise ValueError("type must be one of {}".format(
+                ", ".join(dict(CarModel.CAR_TYPES))))
+        query['type'] = car_type
+    for name in ('min_year', 'max_year'):
+        value = _year_param(params, name)
+        if value is not None:
+            query[name] = value
+    if params.get('q'):
+        query['q'] = params['q'].lower()
+    return query
+
+
+def search_car_models(query):
+    """ Returns the car models matching a catalog search, sorted by name.
+
+        The name prefix is matched as a range on the lower-cased name, which
+        the carmodel_lower_name_idx index answers without a scan.
+
+        Args:
+            query (dict): A search built by `parse_catalog_query`.
+
+        Returns:
+            QuerySet: Dictionaries with "id", "CarModel", "CarMake", "type"
+                and "year", for slicing and counting by the caller.
+    """
+    car_models = CarModel.objects.annotate(lower_name=Lower('name'))
+    if 'make' in query:
+        makes = CarMake.objects.annotate(lower_name=Lower('name')).filter(
+            lower_name=query['make']).values('pk')
+        car_models = car_models.filter(car_make__in=makes)
+    if 'type' in query:
+        car_models = car_models.filter(type=query['type'])
+    if 'min_year' in query:
+        car_models = car_models.filter(year__gte=query['min_year'])
+    if 'max_year' in query:
+        car_models = car_models.filter(year__lte=query['max_year'])
+    if 'q' in query:
+        car_models = car_models.filter(
+            lower_name__gte=query['q'],
+            lower_name__lt=query['q'] + '\U0010ffff')
+    return car_models.order_by('lower_name', 'pk').values(
+        'id', 'type', 'year', CarModel=F('name'),
+        CarMake=F('car_make__name'))
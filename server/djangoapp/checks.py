@@ -0,0 +1,100 @@
+""" System checks confirming that the database and session settings of
+    djangoproj/settings.py, and the sentiment backend of restapis.py, took
+    effect.
+
+    The database checks connect to the database, so Django only runs them
+    when asked to (`manage.py check --database default`, and before
+    `manage.py migrate`); entrypoint.sh runs them on startup.
+
+Flow:
+    Startup Checks: Reports settings that did not take effect.
+
+    Flow:
+        1. Django Startup: `manage.py check` or `migrate` runs the registered
+           system checks.
+        > 2. Current File (checks.py): The database connection is inspected
+             (journal mode of SQLite, pool of PostgreSQL), SESSION_MODE is
+             validated and the in-process sentiment analyzer is loaded if
+             `sentiment_backend` uses it.
+        3. Report: Problems are printed as warnings or errors.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+SESSION_MODES = ('signed_cookies', 'cache', 'cached_db', 'db')
+SENTIMENT_BACKENDS = ('remote', 'local', 'auto')
+
+
+@register()
+def check_session_mode(app_configs, **kwargs):
+    if settings.SESSION_MODE not in SESSION_MODES:
+        return [Error(
+            "SESSION_MODE is {!r}.".format(settings.SESSION_MODE),
+            hint="Use one of: {}.".format(", ".join(SESSION_MODES)),
+            id='djangoapp.E001')]
+    return []
+
+
+@register()
+def check_sentiment_backend(app_configs, **kwargs):
+    from . import restapis
+
+    backend = restapis.sentiment_backend
+    if backend not in SENTIMENT_BACKENDS:
+        return [Error(
+            "sentiment_backend is {!r}.".format(backend),
+            hint="Use one of: {}.".format(", ".join(SENTIMENT_BACKENDS)),
+            id='djangoapp.E003')]
+    if backend == 'remote' or restapis._sentiment_analyzer() is not None:
+        return []
+    hint = ("Install nltk (requirements.txt) and check that "
+            "sentiment/vader_lexicon.zip is in sentiment_lexicon_dir ({})."
+            .format(restapis.sentiment_lexicon_dir))
+    if backend == 'local':
+        return [Error("In-process sentiment scoring is unavailable, so "
+                      "every review would be scored as unknown.",
+                      hint=hint, id='djangoapp.E004')]
+    return [Warning("In-process sentiment scoring is unavailable, so "
+                    "sentiment_backend=auto cannot fall back to it.",
+                    hint=hint, id='djangoapp.W003')]
+
+
+def _sqlite_pragma(cursor, name):
+    cursor.execute('PRAGMA {}'.format(name))
+    return cursor.fetchone()[0]
+
+
+@register(Tags.database)
+def check_database_profile(app_configs, databases=None, **kwargs):
+    if not databases or 'default' not in databases:
+        return []
+    connection = connections['default']
+    issues = []
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            journal_mode = _sqlite_pragma(cursor, 'journal_mode')
+        if journal_mode.lower() != 'wal':
+            issues.append(Warning(
+                "SQLite runs in {} journal mode, not WAL.".format(
+                    journal_mode),
+                hint="Readers will wait for writers. Check that the "
+                     "database file is on a local filesystem that supports "
+                     "WAL.",
+                id='djangoapp.W001'))
+    elif connection.vendor == 'postgresql':
+        if settings.DATABASES['default'].get('OPTIONS', {}).get('pool'):
+            try:
+                pool = connection.pool
+            except ImproperlyConfigured as e:
+                pool = None
+                issues.append(Error(str(e), id='djangoapp.E002'))
+            if pool is None and not issues:
+                issues.append(Warning(
+                    "PostgreSQL connection pooling is not active.",
+                    hint="Install psycopg with the pool extra "
+                         "(psycopg[pool]).",
+                    id='djangoapp.W002'))
+    return issues
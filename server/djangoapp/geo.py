@@ -0,0 +1,285 @@
+""" Nearest-dealer search over the coordinates of the dealer feed.
+
+    Dealers are kept in a KD-tree of points on the unit sphere: each
+    (lat, long) becomes a 3D unit vector, so the straight-line (chord)
+    distance between two points grows with their great-circle distance and
+    k-nearest and radius queries are answered from the tree without
+    computing the distance to every dealer, in about log(n) steps.
+
+    The index follows the dealer listing cached by restapis.py: every time
+    the full listing is (re)loaded, `DealerIndex.update` applies only what
+    changed. New and moved dealers are inserted into the tree and removed
+    ones are marked dead; once changes amount to `rebuild_fraction` of the
+    dealers, the tree is rebuilt balanced.
+
+Flow:
+    Nearest Dealers: Finds the dealers closest to a location.
+
+    Flow:
+        1. View Function Call (in views.py): `get_dealers_near` parses the
+           location and the number or radius of dealers asked for.
+        2. Dealer Listing (in restapis.py): The cached listing of all dealers
+           is read; a (re)load updates the index.
+        > 3. Current File (geo.py): The KD-tree returns the nearest dealers
+             with their distance.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+# Mean radius of the Earth
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vector(lat, long):
+    """ Returns the point of the unit sphere at a latitude and longitude, in
+        degrees.
+    """
+    phi = math.radians(lat)
+    lam = math.radians(long)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+def chord_to_km(chord):
+    """ Returns the great-circle distance, in km, of a chord of the unit
+        sphere.
+    """
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(km):
+    """ Returns the chord of the unit sphere spanning a great-circle
+        distance, in km.
+    """
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def _distance2(a, b):
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def _coordinates(dealer):
+    # The backend stores lat/long as strings; dealers without usable
+    # coordinates are not indexed.
+    try:
+        lat = float(dealer['lat'])
+        long = float(dealer['long'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= long <= 180):
+        return None
+    return lat, long
+
+
+class _Node:
+    __slots__ = ('point', 'key', 'axis', 'left', 'right', 'alive')
+
+    def __init__(self, point, key, axis):
+        self.point = point
+        self.key = key
+        self.axis = axis
+        self.left = None
+        self.right = None
+        self.alive = True
+
+
+def _build(entries, depth=0):
+    """ Builds a balanced tree from (point, key) pairs. """
+    if not entries:
+        return None
+    axis = depth % 3
+    entries.sort(key=lambda entry: entry[0][axis])
+    middle = len(entries) // 2
+    node = _Node(entries[middle][0], entries[middle][1], axis)
+    node.left = _build(entries[:middle], depth + 1)
+    node.right = _build(entries[middle + 1:], depth + 1)
+    return node
+
+
+class DealerIndex:
+    """ A KD-tree of dealers by location, updated from the dealer listing.
+
+        Thread-safe: updates and queries hold the index lock.
+
+        Args:
+            rebuild_fraction (float): Inserted and removed dealers, as a
+                fraction of the indexed ones, after which the tree is
+                rebuilt balanced instead of updated in place.
+    """
+
+    def __init__(self, rebuild_fraction=0.25):
+        self.rebuild_fraction = rebuild_fraction
+        self._root = None
+        # Dealer id -> (node, dealer record) of every indexed dealer
+        self._entries = {}
+        self._changes = 0
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def update(self, dealers):
+        """ Brings the index in line with a full dealer listing.
+
+            Dealers whose coordinates did not change only have their record
+            replaced; the tree changes only for new, moved or removed ones.
+
+            Args:
+                dealers (list): Dealer records with "id", "lat" and "long".
+
+            Returns:
+                tuple: (added, removed) counts, a moved dealer counting as
+                    both.
+        """
+        listing = {}
+        for dealer in dealers or []:
+            coordinates = _coordinates(dealer)
+            if coordinates is not None and dealer.get('id') is not None:
+                listing[dealer['id']] = (unit_vector(*coordinates), dealer)
+        with self._lock:
+            removed = [key for key, (node, _) in self._entries.items()
+                       if key not in listing or listing[key][0] != node.point]
+            added = [key for key in listing
+                     if key not in self._entries or key in removed]
+            changes = self._changes + len(added) + len(removed)
+            if self._root is None or changes > self.rebuild_fraction * max(
+                    len(listing), len(self._entries)):
+                self._rebuild(listing)
+            else:
+                for key in removed:
+                    self._entries.pop(key)[0].alive = False
+                for key in added:
+                    point, dealer = listing[key]
+                    self._entries[key] = (self._insert(point, key), dealer)
+                self._changes = changes
+                for key, (node, _) in self._entries.items():
+                    self._entries[key] = (node, listing[key][1])
+        return len(added), len(removed)
+
+    def _rebuild(self, listing):
+        self._root = _build([(point, key)
+                             for key, (point, _) in listing.items()])
+        self._entries = {}
+        self._index_nodes(self._root, listing)
+        self._changes = 0
+        self.builds += 1
+
+    def _index_nodes(self, node, listing):
+        while node is not None:
+            self._entries[node.key] = (node, listing[node.key][1])
+            self._index_nodes(node.left, listing)
+            node = node.right
+
+    def _insert(self, point, key):
+        if self._root is None:
+            self._root = _Node(point, key, 0)
+            return self._root
+        node = self._root
+        while True:
+            side = 'left' if point[node.axis] < node.point[node.axis] \
+                else 'right'
+            child = getattr(node, side)
+            if child is None:
+                child = _Node(point, key, (node.axis + 1) % 3)
+                setattr(node, side, child)
+                return child
+            node = child
+
+    def nearest(self, lat, long, k=DEFAULT_PAGE_SIZE, radius_km=None):
+        """ Returns the dealers nearest to a location.
+
+            Args:
+                lat (float), long (float): The location, in degrees.
+                k (int): The most dealers to return.
+                radius_km (float, optional): Only dealers within this
+                    great-circle distance are returned.
+
+            Returns:
+                list: (distance in km, dealer record) pairs, nearest first.
+        """
+        target = unit_vector(lat, long)
+        limit2 = math.inf if radius_km is None else km_to_chord(radius_km) ** 2
+        # Max-heap of the k best (-distance2, tiebreak, key) found so far
+        best = []
+        counter = itertools.count()
+        with self._lock:
+            # (subtree, lower bound of its squared distance to the target)
+            stack = [(self._root, 0.0)]
+            while stack:
+                node, bound2 = stack.pop()
+                worst2 = -best[0][0] if len(best) == k else limit2
+                if node is None or bound2 > worst2:
+                    continue
+                delta = target[node.axis] - node.point[node.axis]
+                near, far = ((node.left, node.right) if delta < 0
+                             else (node.right, node.left))
+                # The far side is searched after the near one, unless by
+                # then its splitting plane is farther than the worst result
+                stack.append((far, max(bound2, delta * delta)))
+                stack.append((near, bound2))
+                if not node.alive:
+                    continue
+                distance2 = _distance2(target, node.point)
+                if distance2 > worst2:
+                    continue
+                entry = (-distance2, -next(counter), node.key)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                else:
+                    heapq.heapreplace(best, entry)
+            results = [(chord_to_km(math.sqrt(-distance2)),
+                        self._entries[key][1])
+                       for distance2, _, key in best]
+        results.sort(key=lambda result: result[0])
+        return results
+
+
+def parse_nearby_query(params):
+    """ Builds a nearest-dealer search from request parameters.
+
+        Accepted parameters:
+            lat, long: the location, in degrees (required).
+            k: the most dealers to return, DEFAULT_PAGE_SIZE by default,
+                at most MAX_PAGE_SIZE.
+            radius: only return dealers within this many km.
+
+        Args:
+            params (QueryDict or dict): The request's query parameters.
+
+        Returns:
+            dict: The search, with "lat", "long", "k" and "radius_km".
+
+        Raises:
+            ValueError: If a parameter is missing or malformed.
+    """
+    query = {}
+    for name, bound in (('lat', 90), ('long', 180)):
+        try:
+            value = float(params[name])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("{} must be a number".format(name))
+        if not -bound <= value <= bound:
+            raise ValueError("{} must be between {} and {}".format(
+                name, -bound, bound))
+        query[name] = value
+    try:
+        query['k'] = int(params.get('k') or DEFAULT_PAGE_SIZE)
+    except ValueError:
+        raise ValueError("k must be an integer")
+    if not 1 <= query['k'] <= MAX_PAGE_SIZE:
+        raise ValueError("k must be between 1 and {}".format(MAX_PAGE_SIZE))
+    query['radius_km'] = None
+    if params.get('radius'):
+        try:
+            query['radius_km'] = float(params['radius'])
+        except ValueError:
+            raise ValueError("radius must be a number")
+        if not query['radius_km'] > 0:
+            raise ValueError("radius must be positive")
+    return query
@@ -0,0 +1,320 @@
+""" Parses dealer inventory searches into one composable query, and keeps
+    a local, indexed copy of the inventory that can answer them.
+
+    A search combines any subset of filters (make, model, body type and
+    year/mileage/price ranges) with sorting and limit/offset. It is answered
+    by a single call to the searchcars service's "/carsearch/<dealer_id>"
+    endpoint, or, with settings.INVENTORY_SOURCE = "local", by one query on
+    the InventoryCar table, which `sync_inventory_records` fills from the
+    carsInventory records.
+
+Flow:
+    Inventory Query: Turns the query parameters of `get_inventory` into the
+    parameters of one downstream search.
+
+    Flow:
+        1. View Function Call (in views.py): `get_inventory` receives the
+           shopper's filters as query parameters.
+        > 2. Current File (inventory.py): The parameters are validated and
+             normalized, and the single-filter parameters of the search page
+             (year, mileage and price buckets) are mapped onto ranges.
+        3. Downstream Search (in restapis.py): The normalized query is sent to
+           the searchcars service, which applies all filters in one query,
+           or `query_local_inventory` applies them to the local store.
+"""
+
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min
+
+from .models import InventoryCar
+
+# Range filters, as (min, max) query parameters, with inclusive bounds
+RANGE_FIELDS = ('year', 'mileage', 'price')
+
+# Fields a search can be sorted on; prefix with "-" for descending order
+SORT_FIELDS = ('year', 'mileage', 'price', 'make', 'model')
+
+# Upper bounds of the mileage and price buckets offered by the search page,
+# e.g. mileage=100000 means 50000 < mileage <= 100000; any other value
+# means "over" the last bound.
+LEGACY_BUCKETS = {
+    'mileage': (50000, 100000, 150000, 200000),
+    'price': (20000, 40000, 60000, 80000),
+}
+
+MAX_LIMIT = 500
+
+
+def _bucket_range(bounds, value):
+    """ Returns the inclusive (min, max) range of the bucket `value` names. """
+    if value == bounds[0]:
+        return None, bounds[0]
+    for lower, upper in zip(bounds, bounds[1:]):
+        if value == upper:
+            return lower + 1, upper
+    return bounds[-1] + 1, None
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError("{} must be an integer".format(name))
+
+
+def parse_inventory_query(params):
+    """ Builds a normalized inventory query from request parameters.
+
+        Accepted parameters:
+            make, model, body_type: exact matches.
+            min_year, max_year, min_mileage, max_mileage, min_price,
+            max_price: inclusive range bounds.
+            year, mileage, price: the search page's filters ("year or newer"
+            and the mileage/price buckets), mapped onto the ranges above.
+            sort: comma separated fields of SORT_FIELDS, "-" for descending.
+            limit (at most MAX_LIMIT), offset.
+
+        Args:
+            params (QueryDict or dict): The request's query parameters.
+
+        Returns:
+            dict: The query, holding only the parameters that were set.
+
+        Raises:
+            ValueError: If a parameter is malformed.
+    """
+    query = {}
+    for name in ('make', 'model', 'body_type'):
+        if params.get(name):
+            query[name] = params[name]
+
+    for field in RANGE_FIELDS:
+        for bound in ('min', 'max'):
+            name = bound + "_" + field
+            value = _int_param(params, name)
+            if value is not None:
+                query[name] = value
+
+    year = _int_param(params, 'year')
+    if year is not None:
+        query['min_year'] = max(year, query.get('min_year', year))
+    for field, bounds in LEGACY_BUCKETS.items():
+        value = _int_param(params, field)
+        if value is None:
+            continue
+        lower, upper = _bucket_range(bounds, value)
+        if lower is not None:
+            query['min_' + field] = max(lower,
+                                        query.get('min_' + field, lower))
+        if upper is not None:
+            query['max_' + field] = min(upper,
+                                        query.get('max_' + field, upper))
+
+    if params.get('sort'):
+        for field in params['sort'].split(','):
+            if field.lstrip('-') not in SORT_FIELDS:
+                raise ValueError("cannot sort by {}".format(field))
+        query['sort'] = params['sort']
+
+    limit = _int_param(params, 'limit')
+    if limit is not None:
+        if not 0 < limit <= MAX_LIMIT:
+            raise ValueError(
+                "limit must be between 1 and {}".format(MAX_LIMIT))
+        query['limit'] = limit
+    offset = _int_param(params, 'offset')
+    if offset is not None:
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        query['offset'] = offset
+    return query
+
+
+# Fields of a carsInventory record, and the InventoryCar field of each
+RECORD_FIELDS = {
+    'dealer_id': 'dealer_id',
+    'make': 'make',
+    'model': 'model',
+    'bodyType': 'body_type',
+    'year': 'year',
+    'mileage': 'mileage',
+    'price': 'price',
+}
+
+# Fields identifying a car without a Mongo _id; mileage and price change
+# over its listing and are left out, so an edit updates the row in place
+IDENTITY_FIELDS = ('dealer_id', 'make', 'model', 'bodyType', 'year')
+
+BATCH_SIZE = 1000
+
+
+def _local_inventory(dealer_id, query):
+    """ Returns the filtered and sorted InventoryCar queryset of a query,
+        before limit/offset.
+    """
+    cars = InventoryCar.objects.filter(dealer_id=dealer_id)
+    for name in ('make', 'model', 'body_type'):
+        if name in query:
+            cars = cars.filter(**{name: query[name]})
+    for field in RANGE_FIELDS:
+        if 'min_' + field in query:
+            cars = cars.filter(**{field + '__gte': query['min_' + field]})
+        if 'max_' + field in query:
+            cars = cars.filter(**{field + '__lte': query['max_' + field]})
+    ordering = [field for field in query.get('sort', '').split(',') if field]
+    return cars.order_by(*ordering, 'pk')
+
+
+def _page_records(cars, query):
+    """ Applies limit/offset and projects rows onto the record layout of the
+        carsInventory service, without creating model instances.
+    """
+    offset = query.get('offset', 0)
+    if 'limit' in query:
+        cars = cars[offset:offset + query['limit']]
+    elif offset:
+        cars = cars[offset:]
+    return cars.values('make', 'model', 'year', 'dealer_id', 'mileage',
+                       'price', _id=F('source_key'),
+                       bodyType=F('body_type'))
+
+
+def query_local_inventory(dealer_id, query):
+    """ Answers an inventory query from the local InventoryCar store.
+
+        Args:
+            dealer_id (int): The ID of the dealer.
+            query (dict): A query built by `parse_inventory_query`.
+
+        Returns:
+            dict: {"total": int, "cars": list} with cars in the record layout
+                of the carsInventory service.
+    """
+    cars = _local_inventory(dealer_id, query)
+    total = cars.count()
+    return {"total": total, "cars": list(_page_records(cars, query))}
+
+
+def iter_local_inventory(dealer_id, query):
+    """ Yields the cars matching an inventory query from the local store,
+        reading them from the database in chunks.
+    """
+    cars = _page_records(_local_inventory(dealer_id, query), query)
+    return cars.iterator(chunk_size=BATCH_SIZE)
+
+
+def summarize_inventory(cars):
+    """ Summarizes a dealer's cars for the dealer page.
+
+        Args:
+            cars (list): Car records in the carsInventory layout.
+
+        Returns:
+            dict: "total" cars, the sorted distinct "makes", and the
+                "year" and "price" ranges as {"min", "max"} (None if there
+                are no cars).
+    """
+    def value_range(field):
+        values = [car[field] for car in cars]
+        if not values:
+            return None
+        return {"min": min(values), "max": max(values)}
+
+    return {"total": len(cars),
+            "makes": sorted({car['make'] for car in cars}),
+            "year": value_range('year'),
+            "price": value_range('price')}
+
+
+def summarize_local_inventory(dealer_id):
+    """ Same as `summarize_inventory`, computed by the database from the
+        local store.
+    """
+    cars = InventoryCar.objects.filter(dealer_id=dealer_id)
+    stats = cars.aggregate(total=Count('pk'),
+                           min_year=Min('year'), max_year=Max('year'),
+                           min_price=Min('price'), max_price=Max('price'))
+    makes = cars.order_by('make').values_list('make', flat=True).distinct()
+    summary = {"total": stats['total'], "makes": list(makes),
+               "year": None, "price": None}
+    if stats['total']:
+        for field in ('year', 'price'):
+            summary[field] = {"min": stats['min_' + field],
+                              "max": stats['max_' + field]}
+    return summary
+
+
+def _source_key(record, seen):
+    """ Returns the identity of a record: its Mongo _id, or else a hash of
+        its IDENTITY_FIELDS numbered by occurrence (cars of the same dealer,
+        make, model, body type and year are distinct rows).
+    """
+    if record.get('_id'):
+        return str(record['_id'])
+    content = "|".join(str(record.get(name)) for name in IDENTITY_FIELDS)
+    digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+    seen[digest] = seen.get(digest, -1) + 1
+    return "{}:{}".format(digest, seen[digest])
+
+
+def sync_inventory_records(records, dealer_ids=None):
+    """ Resyncs the local inventory store with carsInventory records.
+
+        Rows are matched to records by source key; only new, changed and
+        removed cars are written, in bulk and inside one transaction.
+
+        Args:
+            records (list): Car records, e.g. from car_records.json or the
+                searchcars service's "/cars/<dealer_id>" feed.
+            dealer_ids (list, optional): The dealers the records cover. Rows
+                of other dealers are kept. Defaults to every dealer.
+
+        Returns:
+            dict: Counts of "created", "updated", "deleted" and "unchanged"
+                rows.
+    """
+    seen = {}
+    incoming = {}
+    for record in records:
+        values = {field: record[name]
+                  for name, field in RECORD_FIELDS.items()}
+        incoming[_source_key(record, seen)] = values
+
+    fields = list(RECORD_FIELDS.values())
+    counts = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    with transaction.atomic():
+        existing = {row[0]: row[1:] for row in
+                    InventoryCar.objects.values_list('source_key', 'pk',
+                                                     *fields)}
+        to_create = []
+        to_update = []
+        for key, values in incoming.items():
+            row = existing.get(key)
+            if row is None:
+                to_create.append(InventoryCar(source_key=key, **values))
+            elif tuple(values[field] for field in fields) != row[1:]:
+                to_update.append(InventoryCar(pk=row[0], source_key=key,
+                                              **values))
+            else:
+                counts["unchanged"] += 1
+
+        stale = [row[0] for key, row in existing.items()
+                 if key not in incoming
+                 and (dealer_ids is None
+                      or row[fields.index('dealer_id') + 1] in dealer_ids)]
+        for start in range(0, len(stale), BATCH_SIZE):
+            InventoryCar.objects.filter(
+                pk__in=stale[start:start + BATCH_SIZE]).delete()
+        InventoryCar.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        InventoryCar.objects.bulk_update(to_update, fields,
+                                         batch_size=BATCH_SIZE)
+
+    counts["created"] = len(to_create)
+    counts["updated"] = len(to_update)
+    counts["deleted"] = len(stale)
+    return counts
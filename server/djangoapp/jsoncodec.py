@@ -0,0 +1,112 @@
+""" JSON encoding and decoding for djangoapp.
+
+    Response bodies, request bodies and downstream responses are serialized
+    through this module rather than the stdlib `json` module directly. With
+    settings.JSON_BACKEND:
+        auto (default): orjson when it is installed, the stdlib otherwise.
+        orjson: orjson; fails at import if it is not installed.
+        stdlib: the stdlib `json` module.
+
+    Both backends write compact UTF-8 JSON and accept the same values: what
+    the stdlib encodes natively, plus what Django's DjangoJSONEncoder
+    handles (dates, Decimal, UUID, lazy translation strings). Dict keys that
+    are not strings are converted as the stdlib does.
+
+Flow:
+    JSON Serialization: Converts between Python values and JSON bytes.
+
+    Flow:
+        1. View Function Call (in views.py) or Downstream Call (in
+           restapis.py): A request body or downstream response is parsed,
+           or a response is built.
+        > 2. Current File (jsoncodec.py): The configured backend decodes or
+             encodes the JSON.
+        3. HTTP Response: `JsonResponse` sends the encoded bytes as they
+           are.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    # The stdlib backend is used instead
+    orjson = None
+
+JSON_BACKENDS = ('auto', 'orjson', 'stdlib')
+
+# Raised by `loads` for malformed JSON, whatever the backend; orjson's
+# error is a subclass of it.
+JSONDecodeError = json.JSONDecodeError
+
+_default = DjangoJSONEncoder().default
+
+
+def _stdlib_dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def _stdlib_loads(data):
+    return json.loads(data)
+
+
+def _orjson_dumps(value):
+    return orjson.dumps(value, default=_default,
+                        option=orjson.OPT_NON_STR_KEYS)
+
+
+def _orjson_loads(data):
+    return orjson.loads(data)
+
+
+def backend_functions(name):
+    """ Returns the (dumps, loads) pair of a JSON backend.
+
+        Args:
+            name (str): One of JSON_BACKENDS.
+
+        Returns:
+            tuple: `dumps(value)` returning bytes and `loads(data)` taking
+                bytes or str.
+
+        Raises:
+            ValueError: For an unknown backend name.
+            ImportError: For "orjson" when orjson is not installed.
+    """
+    if name not in JSON_BACKENDS:
+        raise ValueError("JSON backend must be one of {}".format(
+            ", ".join(JSON_BACKENDS)))
+    if name == 'orjson' and orjson is None:
+        raise ImportError("JSON_BACKEND is orjson, which is not installed")
+    if name == 'stdlib' or orjson is None:
+        return _stdlib_dumps, _stdlib_loads
+    return _orjson_dumps, _orjson_loads
+
+
+backend = ('orjson' if settings.JSON_BACKEND != 'stdlib' and orjson
+           else 'stdlib')
+dumps, loads = backend_functions(settings.JSON_BACKEND)
+
+
+class JsonResponse(HttpResponse):
+    """ An HTTP response with a JSON body, encoded by the configured
+        backend. Used like django.http.JsonResponse.
+
+        Args:
+            data: The value to encode; a dict unless `safe` is False.
+            safe (bool): Whether only dicts may be encoded, as in Django.
+            **kwargs: Passed on to HttpResponse.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set "
+                "the safe parameter to False.")
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
@@ -0,0 +1,150 @@
+""" Queued, structured logging for djangoapp.
+
+    Request threads only put log records on an in-memory queue; a background
+    thread formats them as JSON lines and writes them out, so log I/O never
+    runs inside a request. When the queue is full, records are dropped (and
+    counted) rather than blocking the request.
+
+    Conventions of djangoapp loggers:
+        - Context goes in `extra`, which becomes fields of the JSON record,
+          e.g. logger.warning("downstream request failed",
+                              extra={"downstream": "backend", "error": ...}).
+        - DEBUG events are sampled per call site (see SampleFilter), so
+          per-request debug logging stays cheap when enabled.
+        - Payloads (request bodies, downstream responses) are only logged on
+          the "djangoapp.payloads" logger at DEBUG, which settings turn off
+          unless LOG_PAYLOAD_LEVEL=DEBUG.
+
+Flow:
+    Logging: Moves log output off the request path.
+
+    Flow:
+        1. Log Call (in views.py, restapis.py, ...): A logger of the
+           "djangoapp" hierarchy emits a record.
+        > 2. Current File (log.py): SampleFilter drops most repeated DEBUG
+             records and QueuedHandler enqueues the rest without blocking.
+        3. Listener Thread (in log.py): Records are formatted by
+           JsonFormatter and written to stdout.
+"""
+
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import weakref
+
+# Attributes of every LogRecord; anything else was passed in `extra`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord(
+    '', 0, '', 0, '', (), None)).keys()) | {'message', 'asctime'}
+
+_handlers = weakref.WeakSet()
+
+
+class JsonFormatter(logging.Formatter):
+    """ Formats a record as one JSON object: "time", "level", "logger",
+        "message", the fields passed in `extra` and, if any, "exception".
+    """
+
+    def format(self, record):
+        data = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS and not name.startswith('_'):
+                data[name] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """ Passes the first DEBUG record of each call site, then one in `rate`.
+        Records of other levels always pass.
+
+        Args:
+            rate (int): Sampling rate of DEBUG records; 1 keeps them all.
+    """
+
+    def __init__(self, rate=100):
+        super().__init__()
+        self.rate = max(1, int(rate))
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG or self.rate == 1:
+            return True
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(site, 0)
+            self._counts[site] = count + 1
+        return count % self.rate == 0
+
+
+class QueuedHandler(logging.handlers.QueueHandler):
+    """ Enqueues records for a background thread that writes them to a
+        stream, formatted by this handler's formatter.
+
+        Args:
+            stream (file, optional): Where records are written. Defaults to
+                sys.stdout.
+            maxsize (int): Records buffered before new ones are dropped.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.dropped = 0
+        self._listener = None
+        self.start()
+        _handlers.add(self)
+
+    def setFormatter(self, fmt):
+        # Formatting happens in the listener thread, by the target handler
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Records stay in this process, so they are passed on as they are
+        # and formatted later; only the message arguments are resolved now,
+        # in case they are mutated after the call.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        self._listener = logging.handlers.QueueListener(self.queue,
+                                                        self.target)
+        self._listener.start()
+
+    def close(self):
+        """ Writes the records still queued and stops the listener. """
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        super().close()
+
+
+def _restart_listeners():
+    # A forked child (e.g. a gunicorn worker of a preloaded app) inherits
+    # the handlers but not their listener threads.
+    for handler in list(_handlers):
+        if handler._listener is not None:
+            handler.start()
+
+
+os.register_at_fork(after_in_child=_restart_listeners)
@@ -0,0 +1,42 @@
+""" Computes and stores the sentiment of existing reviews, e.g.:
+        python manage.py backfill_review_sentiments
+        python manage.py backfill_review_sentiments --file reviews.json
+        python manage.py backfill_review_sentiments --feed
+"""
+
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp.restapis import get_request
+from djangoapp.reviews import backfill_review_sentiments
+
+DEFAULT_REVIEWS = os.path.join(settings.BASE_DIR, 'database', 'data',
+                               'reviews.json')
+
+
+class Command(BaseCommand):
+    help = "Store the sentiment of reviews that have none stored yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=DEFAULT_REVIEWS,
+                            help="reviews.json file to load")
+        parser.add_argument('--feed', action='store_true',
+                            help="Load every review from the backend's "
+                                 "/fetchReviews endpoint")
+
+    def handle(self, *args, **options):
+        if options['feed']:
+            reviews = get_request("/fetchReviews")
+            if reviews is None:
+                raise CommandError("Could not fetch the reviews")
+        else:
+            with open(options['file'], encoding='utf-8') as reviews_file:
+                reviews = json.load(reviews_file)['reviews']
+
+        counts = backfill_review_sentiments(reviews)
+        self.stdout.write(self.style.SUCCESS(
+            "{stored} stored, {skipped} already stored, "
+            "{unknown} could not be scored".format(**counts)))
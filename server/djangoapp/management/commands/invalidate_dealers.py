@@ -0,0 +1,22 @@
+""" Drops the cached dealer listings of every worker.
+
+    Run after dealer data changed in the backend, e.g.:
+        python manage.py invalidate_dealers
+        python manage.py invalidate_dealers --state Texas
+"""
+
+from django.core.management.base import BaseCommand
+
+from djangoapp.restapis import invalidate_dealers
+
+
+class Command(BaseCommand):
+    help = "Invalidate the cached dealer listings of all workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--state',
+                            help="Only the listing of this state changed")
+
+    def handle(self, *args, **options):
+        invalidate_dealers(options['state'])
+        self.stdout.write(self.style.SUCCESS("Dealer listings invalidated"))
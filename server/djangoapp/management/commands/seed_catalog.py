@@ -0,0 +1,24 @@
+""" Seeds the car make/model catalog from a JSON or CSV file.
+
+    Idempotent: only makes and models missing from the database are
+    inserted, e.g.:
+        python manage.py seed_catalog
+        python manage.py seed_catalog --file catalog.csv
+"""
+
+from django.core.management.base import BaseCommand
+
+from djangoapp.populate import DEFAULT_CATALOG, initiate
+
+
+class Command(BaseCommand):
+    help = "Insert missing car makes and models from a catalog file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=DEFAULT_CATALOG,
+                            help="Catalog file (.json or .csv)")
+
+    def handle(self, *args, **options):
+        makes, models = initiate(options['file'])
+        self.stdout.write(self.style.SUCCESS(
+            "Created {} car makes and {} car models".format(makes, models)))
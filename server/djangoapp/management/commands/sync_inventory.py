@@ -0,0 +1,55 @@
+""" Resyncs the local inventory store (InventoryCar) with the carsInventory
+    records, writing only what changed, e.g.:
+        python manage.py sync_inventory
+        python manage.py sync_inventory --file car_records.json
+        python manage.py sync_inventory --feed --dealer 1 --dealer 2
+"""
+
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp.inventory import sync_inventory_records
+from djangoapp.restapis import get_dealers, searchcars_request
+
+DEFAULT_RECORDS = os.path.join(settings.BASE_DIR, 'carsInventory', 'data',
+                               'car_records.json')
+
+
+class Command(BaseCommand):
+    help = "Resync the local inventory store and report changed rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=DEFAULT_RECORDS,
+                            help="car_records.json file to load")
+        parser.add_argument('--feed', action='store_true',
+                            help="Load from the searchcars /cars/<id> feed")
+        parser.add_argument('--dealer', type=int, action='append',
+                            help="Dealer to resync from the feed "
+                                 "(default: every dealer)")
+
+    def handle(self, *args, **options):
+        if options['feed']:
+            dealer_ids = options['dealer']
+            if not dealer_ids:
+                dealers = get_dealers() or []
+                dealer_ids = [dealer['id'] for dealer in dealers]
+            records = []
+            for dealer_id in dealer_ids:
+                cars = searchcars_request("/cars/"+str(dealer_id))
+                if cars is None:
+                    raise CommandError(
+                        "Could not fetch the cars of dealer {}".format(
+                            dealer_id))
+                records.extend(cars)
+        else:
+            dealer_ids = None
+            with open(options['file'], encoding='utf-8') as records_file:
+                records = json.load(records_file)['cars']
+
+        counts = sync_inventory_records(records, dealer_ids)
+        self.stdout.write(self.style.SUCCESS(
+            "{created} created, {updated} updated, {deleted} deleted, "
+            "{unchanged} unchanged".format(**counts)))
@@ -0,0 +1,114 @@
+""" Timing instrumentation of djangoapp, exported in the Prometheus format.
+
+    Two latency histograms are kept:
+        djangoapp_request_duration_seconds: Each request, labelled with the
+            view ("endpoint"), HTTP method and response status.
+        djangoapp_downstream_duration_seconds: Each call made through
+            restapis.py, labelled with the downstream service, its route and
+            the response status (or "error" / "rejected" when no response
+            came back).
+
+    Under gunicorn every worker writes its samples to files in
+    PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py) and `/metrics` merges
+    them, so any worker answers for the whole server. Each response also
+    carries a `Server-Timing` header with the time its request spent in the
+    app and in each downstream service.
+
+Flow:
+    Metrics: Measures where request time goes.
+
+    Flow:
+        1. Request (in middleware.py): `metrics_middleware` starts collecting
+           the timings of the request.
+        2. Downstream Call (in restapis.py): Each call reports its duration
+           with `observe_downstream`.
+        > 3. Current File (metrics.py): Durations are added to the histograms
+             and to the request's Server-Timing entries.
+        4. Scrape (in views.py): `get_metrics` renders all histograms at
+           `/metrics`.
+"""
+
+import contextvars
+import os
+import re
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Histogram, generate_latest,
+                               multiprocess)
+
+REQUEST_LATENCY = Histogram(
+    'djangoapp_request_duration_seconds',
+    'Time spent serving a request, by view.',
+    ['endpoint', 'method', 'status'])
+
+DOWNSTREAM_LATENCY = Histogram(
+    'djangoapp_downstream_duration_seconds',
+    'Time spent in a call to a downstream service.',
+    ['downstream', 'endpoint', 'status'])
+
+# Downstream time of the current request, by downstream: [seconds, calls]
+_timings = contextvars.ContextVar('server_timings', default=None)
+
+
+def route_label(path):
+    """ Turns a downstream path into a low-cardinality route label, e.g.
+        "/fetchDealer/15" into "/fetchDealer/:id".
+    """
+    return re.sub(r'/\d+(?=/|$)', '/:id', path)
+
+
+def start_timings():
+    """ Starts collecting the downstream timings of the current request.
+
+        Returns:
+            Token: Pass it to `end_timings` when the request is done.
+    """
+    return _timings.set({})
+
+
+def end_timings(token):
+    _timings.reset(token)
+
+
+def observe_request(endpoint, method, status, seconds):
+    REQUEST_LATENCY.labels(endpoint, method, str(status)).observe(seconds)
+
+
+def observe_downstream(downstream, endpoint, status, seconds):
+    """ Records one downstream call in the histogram and in the current
+        request's Server-Timing entries.
+    """
+    DOWNSTREAM_LATENCY.labels(downstream, endpoint,
+                              str(status)).observe(seconds)
+    timings = _timings.get()
+    if timings is not None:
+        timing = timings.setdefault(downstream, [0.0, 0])
+        timing[0] += seconds
+        timing[1] += 1
+
+
+def server_timing(total):
+    """ Returns the Server-Timing header of the current request.
+
+        Args:
+            total (float): Seconds the whole request took.
+    """
+    entries = ['app;dur={:.1f}'.format(total * 1000)]
+    for downstream, (seconds, calls) in sorted((_timings.get() or {}).items()):
+        entries.append('{};desc="{} calls";dur={:.1f}'.format(
+            downstream, calls, seconds * 1000))
+    return ', '.join(entries)
+
+
+def render_metrics():
+    """ Renders the metrics of every worker in the Prometheus text format.
+
+        Returns:
+            tuple: (body, content type).
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
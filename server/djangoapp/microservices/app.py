@@ -1,10 +1,19 @@
-from flask import Flask
+from flask import Flask, jsonify, request
 from nltk.sentiment import SentimentIntensityAnalyzer
 import json
 app = Flask("Sentiment Analyzer")
 
+# Loaded at import: under gunicorn (gunicorn.conf.py preloads the app) this
+# happens once in the master, and the forked workers share the lexicon.
 sia = SentimentIntensityAnalyzer()
 
+# Texts scored once at import, before any request is served
+WARMUP_TEXTS = (
+    "Fantastic services, the staff was friendly and helpful.",
+    "Terrible experience, I would not recommend this dealer.",
+    "The car was delivered on Tuesday.",
+)
+
 
 @app.get('/')
 def home():
@@ -12,24 +21,50 @@ def home():
     Use /analyze/text to get the sentiment"
 
 
-@app.get('/analyze/<input_txt>')
-def analyze_sentiment(input_txt):
-
-    scores = sia.polarity_scores(input_txt)
-    print(scores)
+def classify(text):
+    scores = sia.polarity_scores(text)
     pos = float(scores['pos'])
     neg = float(scores['neg'])
     neu = float(scores['neu'])
     res = "positive"
-    print("pos neg nue ", pos, neg, neu)
     if (neg > pos and neg > neu):
         res = "negative"
     elif (neu > neg and neu > pos):
         res = "neutral"
-    res = json.dumps({"sentiment": res})
-    print(res)
     return res
 
 
+def warm_up():
+    for text in WARMUP_TEXTS:
+        classify(text)
+
+
+@app.get('/ready')
+def readiness():
+    """Reports 200. The app is loaded and warmed up at import, before the
+    server accepts connections, so any answer means the service is ready"""
+    return jsonify({"status": "ready"})
+
+
+@app.get('/analyze/<input_txt>')
+def analyze_sentiment(input_txt):
+
+    res = json.dumps({"sentiment": classify(input_txt)})
+    app.logger.debug(res)
+    return res
+
+
+@app.post('/analyze_batch')
+def analyze_batch():
+    """Scores a JSON array of texts, returning sentiments in the same order"""
+    texts = request.get_json(silent=True)
+    if (not isinstance(texts, list)
+            or not all(isinstance(text, str) for text in texts)):
+        return jsonify({"error": "Expected a JSON array of strings"}), 400
+    return jsonify({"sentiments": [classify(text) for text in texts]})
+
+
+warm_up()
+
 if __name__ == "__main__":
     app.run(debug=True)
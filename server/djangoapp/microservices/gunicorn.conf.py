@@ -0,0 +1,24 @@
+""" Gunicorn configuration of the sentiment analyzer.
+
+    Scoring is CPU-bound, so requests are spread over a pool of worker
+    processes, one per core by default (SENTIMENT_WORKERS). The app is
+    loaded and warmed up once in the master before the workers are forked,
+    so they share the VADER lexicon copy-on-write instead of each loading
+    their own copy.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv('SENTIMENT_BIND', ':5000')
+workers = int(os.getenv('SENTIMENT_WORKERS', multiprocessing.cpu_count()))
+wsgi_app = 'app:app'
+preload_app = True
+
+
+def when_ready(server):
+    # Move the preloaded objects out of the garbage collector's reach, so
+    # that collections in the workers do not write to (and copy) the pages
+    # shared with the master.
+    gc.freeze()
@@ -0,0 +1,101 @@
+""" Middleware of djangoapp.
+
+Flow:
+    Request Middleware: Wraps every request before it reaches its view.
+
+    Flow:
+        1. Incoming HTTP Request: Django passes the request through the
+           middleware listed in settings.MIDDLEWARE.
+        > 2. Current File (middleware.py): The request is timed (see
+             metrics.py) and a time budget for downstream calls is started
+             (see breakers.py).
+        3. View Function Execution (in views.py): Downstream calls made while
+           handling the request share the budget and report their timings.
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .breakers import end_budget, start_budget
+from .metrics import (end_timings, observe_request, server_timing,
+                      start_timings)
+
+
+def _endpoint(request):
+    # The URL pattern name, so that e.g. every dealer id shares one label
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else "unmatched"
+
+
+def _finish(request, response, started):
+    elapsed = time.perf_counter() - started
+    observe_request(_endpoint(request), request.method,
+                    response.status_code, elapsed)
+    response['Server-Timing'] = server_timing(elapsed)
+    return response
+
+
+def metrics_middleware(get_response):
+    """ Records the latency of every request in the request histogram and
+        adds a Server-Timing header to its response. Works for both sync and
+        async views.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = time.perf_counter()
+            token = start_timings()
+            try:
+                response = await get_response(request)
+                return _finish(request, response, started)
+            finally:
+                end_timings(token)
+
+        markcoroutinefunction(middleware)
+    else:
+        def middleware(request):
+            started = time.perf_counter()
+            token = start_timings()
+            try:
+                response = get_response(request)
+                return _finish(request, response, started)
+            finally:
+                end_timings(token)
+
+    return middleware
+
+
+metrics_middleware.sync_capable = True
+metrics_middleware.async_capable = True
+
+
+def downstream_budget_middleware(get_response):
+    """ Bounds the time a request may spend waiting on downstream services
+        to settings.DOWNSTREAM_TIME_BUDGET seconds. Works for both sync and
+        async views.
+    """
+    budget = settings.DOWNSTREAM_TIME_BUDGET
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = start_budget(budget)
+            try:
+                return await get_response(request)
+            finally:
+                end_budget(token)
+
+        markcoroutinefunction(middleware)
+    else:
+        def middleware(request):
+            token = start_budget(budget)
+            try:
+                return get_response(request)
+            finally:
+                end_budget(token)
+
+    return middleware
+
+
+downstream_budget_middleware.sync_capable = True
+downstream_budget_middleware.async_capable = True
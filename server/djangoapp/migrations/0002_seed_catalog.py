@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# The catalog as of this migration (data/car_catalog.json), kept here so
+# that later changes to the file or to populate.py do not change what the
+# migration does. Later catalogs are loaded with `manage.py seed_catalog`.
+CAR_MAKES = [
+    ("NISSAN", "Great cars. Japanese technology"),
+    ("Mercedes", "Great cars. German technology"),
+    ("Audi", "Great cars. German technology"),
+    ("Kia", "Great cars. Korean technology"),
+    ("Toyota", "Great cars. Japanese technology"),
+]
+
+# (name, make, type, year)
+CAR_MODELS = [
+    ("Pathfinder", "NISSAN", "SUV", 2023),
+    ("Qashqai", "NISSAN", "SUV", 2023),
+    ("XTRAIL", "NISSAN", "SUV", 2023),
+    ("A-Class", "Mercedes", "SUV", 2023),
+    ("C-Class", "Mercedes", "SUV", 2023),
+    ("E-Class", "Mercedes", "SUV", 2023),
+    ("A4", "Audi", "SUV", 2023),
+    ("A5", "Audi", "SUV", 2023),
+    ("A6", "Audi", "SUV", 2023),
+    ("Sorrento", "Kia", "SUV", 2023),
+    ("Carnival", "Kia", "SUV", 2023),
+    ("Cerato", "Kia", "SEDAN", 2023),
+    ("Corolla", "Toyota", "SEDAN", 2023),
+    ("Camry", "Toyota", "SEDAN", 2023),
+    ("Kluger", "Toyota", "SUV", 2023),
+]
+
+
+def seed_catalog(apps, schema_editor):
+    # Inserts what is missing, matching makes by name and models by make,
+    # name and year, so rows created before this migration are kept
+    CarMake = apps.get_model('djangoapp', 'CarMake')
+    CarModel = apps.get_model('djangoapp', 'CarModel')
+
+    existing_makes = set(CarMake.objects.values_list('name', flat=True))
+    CarMake.objects.bulk_create([
+        CarMake(name=name, description=description)
+        for name, description in CAR_MAKES if name not in existing_makes])
+
+    make_ids = dict(CarMake.objects.values_list('name', 'id'))
+    existing_models = set(CarModel.objects.values_list(
+        'car_make_id', 'name', 'year'))
+    CarModel.objects.bulk_create([
+        CarModel(name=name, car_make_id=make_ids[make], type=car_type,
+                 year=year)
+        for name, make, car_type, year in CAR_MODELS
+        if (make_ids[make], name, year) not in existing_models])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_catalog, migrations.RunPython.noop),
+    ]
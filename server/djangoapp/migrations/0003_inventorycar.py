@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0002_seed_catalog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryCar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_key', models.CharField(max_length=64, unique=True)),
+                ('dealer_id', models.IntegerField()),
+                ('make', models.CharField(max_length=50)),
+                ('model', models.CharField(max_length=50)),
+                ('body_type', models.CharField(max_length=20)),
+                ('year', models.IntegerField()),
+                ('mileage', models.IntegerField()),
+                ('price', models.IntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dealer_id', 'make', 'model'], name='inventory_dealer_make_model'), models.Index(fields=['dealer_id', 'year'], name='inventory_dealer_year'), models.Index(fields=['dealer_id', 'mileage'], name='inventory_dealer_mileage'), models.Index(fields=['dealer_id', 'price'], name='inventory_dealer_price')],
+            },
+        ),
+    ]
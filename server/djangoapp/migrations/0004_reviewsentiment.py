@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0003_inventorycar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewSentiment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_id', models.IntegerField(unique=True)),
+                ('sentiment', models.CharField(max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:22
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0004_reviewsentiment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carmake',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='carmake_lower_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(fields=['car_make', 'type', 'year'], name='carmodel_make_type_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(fields=['type', 'year'], name='carmodel_type_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(django.db.models.functions.text.Lower('name'), models.F('car_make'), name='carmodel_lower_name_idx'),
+        ),
+    ]
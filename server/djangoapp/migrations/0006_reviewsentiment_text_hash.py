@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0005_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewsentiment',
+            name='text_hash',
+            field=models.CharField(default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+# The keys of CarModel.CAR_TYPES when this migration was written
+CAR_TYPES = ('SEDAN', 'SUV', 'WAGON')
+
+
+def normalize_car_types(apps, schema_editor):
+    # Rows seeded with the labels ("Sedan") instead of the keys ("SEDAN")
+    # were never matched by the catalog's type filter
+    CarModel = apps.get_model('djangoapp', 'CarModel')
+    for car_type in CAR_TYPES:
+        CarModel.objects.filter(type__iexact=car_type).exclude(
+            type=car_type).update(type=car_type)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0006_reviewsentiment_text_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_car_types, migrations.RunPython.noop),
+    ]
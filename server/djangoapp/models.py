@@ -28,6 +28,7 @@ Flow:
 """
 
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.timezone import now
 from django.core.validators import MaxValueValidator, MinValueValidator
 
@@ -38,6 +39,12 @@ class CarMake(models.Model):
     name = models.CharField(max_length=20)
     description = models.TextField()
 
+    class Meta:
+        indexes = [
+            # Case-insensitive lookup by name in the catalog search
+            models.Index(Lower('name'), name='carmake_lower_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -59,5 +66,66 @@ class CarModel(models.Model):
         ]
     )
 
+    class Meta:
+        # Serve the filters of the catalog search (see catalog.py)
+        indexes = [
+            models.Index(fields=['car_make', 'type', 'year'],
+                         name='carmodel_make_type_year_idx'),
+            models.Index(fields=['type', 'year'],
+                         name='carmodel_type_year_idx'),
+            models.Index(Lower('name'), 'car_make',
+                         name='carmodel_lower_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
+
+
+class ReviewSentiment(models.Model):
+    """ The sentiment of a review stored by the backend, computed once when
+        the review is submitted (or backfilled) since its text never changes.
+
+        The backend reuses review ids after it is reseeded, so the hash of
+        the text the sentiment was computed for is kept too; a row whose
+        hash does not match the review is stale and gets overwritten.
+    """
+    review_id = models.IntegerField(unique=True)
+    # SHA-256 of the review text (see reviews.text_hash)
+    text_hash = models.CharField(max_length=64, default='')
+    sentiment = models.CharField(max_length=10)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return "{}: {}".format(self.review_id, self.sentiment)
+
+
+class InventoryCar(models.Model):
+    """ A car of a dealer's inventory, mirrored from the carsInventory
+        service's records so that `get_inventory` can search it locally.
+    """
+    # Identity of the record in the source (Mongo _id or an identity hash),
+    # used to resync incrementally
+    source_key = models.CharField(max_length=64, unique=True)
+    dealer_id = models.IntegerField()
+    make = models.CharField(max_length=50)
+    model = models.CharField(max_length=50)
+    body_type = models.CharField(max_length=20)
+    year = models.IntegerField()
+    mileage = models.IntegerField()
+    price = models.IntegerField()
+
+    class Meta:
+        # Searches always filter on the dealer first
+        indexes = [
+            models.Index(fields=['dealer_id', 'make', 'model'],
+                         name='inventory_dealer_make_model'),
+            models.Index(fields=['dealer_id', 'year'],
+                         name='inventory_dealer_year'),
+            models.Index(fields=['dealer_id', 'mileage'],
+                         name='inventory_dealer_mileage'),
+            models.Index(fields=['dealer_id', 'price'],
+                         name='inventory_dealer_price'),
+        ]
+
+    def __str__(self):
+        return "{} {} {}".format(self.year, self.make, self.model)
@@ -0,0 +1,101 @@
+""" Cursor pagination for the list endpoints of djangoapp.
+
+    A client asks for a page with `limit` and gets back the page, a `total`
+    count hint and an opaque `next_cursor`; passing that value as `cursor`
+    returns the following page. Cursors are signed and bound to the list
+    they were issued for (e.g. the reviews of one dealer, or one inventory
+    search), so a tampered or mismatched cursor is rejected.
+
+Flow:
+    Pagination: Limits list responses to one page.
+
+    Flow:
+        1. View Function Call (in views.py): A list view reads `limit` and
+           `cursor` from the query parameters.
+        > 2. Current File (pagination.py): The cursor is verified and turned
+             into an offset; after the page is fetched, the cursor of the
+             next page is issued.
+        3. Data Access: The view pushes offset/limit down to the downstream
+           query where it supports them, and slices the list otherwise.
+"""
+
+from django.core import signing
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 500
+
+_CURSOR_SALT = 'djangoapp.pagination.cursor'
+
+
+def encode_cursor(offset, scope):
+    """ Returns the opaque cursor of the page starting at `offset`. """
+    return signing.dumps({"o": offset, "s": scope}, salt=_CURSOR_SALT,
+                         compress=True)
+
+
+def decode_cursor(cursor, scope):
+    """ Returns the offset a cursor points at.
+
+        Raises:
+            ValueError: If the cursor is invalid or was issued for another
+                list.
+    """
+    try:
+        data = signing.loads(cursor, salt=_CURSOR_SALT)
+    except signing.BadSignature:
+        raise ValueError("Invalid cursor")
+    if data.get("s") != scope:
+        raise ValueError("Cursor does not belong to this list")
+    return data["o"]
+
+
+def requested_page(params, scope):
+    """ Reads the page a request asks for.
+
+        Args:
+            params (QueryDict or dict): The request's query parameters.
+            scope (str): Identifies the list (endpoint and filters).
+
+        Returns:
+            tuple: (offset, limit), or None if the request is not paginated
+                (neither `limit` nor `cursor` is given).
+
+        Raises:
+            ValueError: If `limit` or `cursor` is invalid.
+    """
+    limit = params.get('limit')
+    cursor = params.get('cursor')
+    if not limit and not cursor:
+        return None
+    if limit:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if not 0 < limit <= MAX_PAGE_SIZE:
+            raise ValueError(
+                "limit must be between 1 and {}".format(MAX_PAGE_SIZE))
+    else:
+        limit = DEFAULT_PAGE_SIZE
+    offset = decode_cursor(cursor, scope) if cursor else 0
+    return offset, limit
+
+
+def page_info(scope, offset, count, total):
+    """ Returns the pagination fields of a response.
+
+        Args:
+            scope (str): The scope the page was requested with.
+            offset (int): Offset of the page.
+            count (int): Number of items in the page.
+            total (int): Number of items in the whole list, if known.
+
+        Returns:
+            dict: "total" and "next_cursor" (None on the last page).
+    """
+    next_offset = offset + count
+    if count and (total is None or next_offset < total):
+        next_cursor = encode_cursor(next_offset, scope)
+    else:
+        next_cursor = None
+    return {"total": total, "next_cursor": next_cursor}
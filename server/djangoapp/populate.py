@@ -3,71 +3,109 @@
     initial or sample data.
 
     Flow:
-        1. Developer Execution: Developer runs this script
-           (e.g., via Django shell or manage.py command).
-        > 2. Current File (populate.py): This file contains Python code that
-             interacts with Django models.
+        1. Developer Execution: Developer runs the `seed_catalog` management
+           command. (The `0002_seed_catalog` migration keeps its own copy of
+           the initial catalog.)
+        > 2. Current File (populate.py): This file reads the car catalog
+             (data/car_catalog.json, or any JSON/CSV file) and inserts what
+             is missing.
         3. ORM Interaction: The script uses the ORM (defined in models.py) to
-           create and save data.
+           create the rows with `bulk_create`, inside one transaction.
         4. Database Update: The database is populated with the data defined
-           in the script.
+           in the catalog file.
 """
 
-from .models import CarMake, CarModel
-
-
-def initiate():
-    car_make_data = [
-        {"name": "NISSAN", "description": "Great cars. Japanese technology"},
-        {"name": "Mercedes", "description": "Great cars. German technology"},
-        {"name": "Audi", "description": "Great cars. German technology"},
-        {"name": "Kia", "description": "Great cars. Korean technology"},
-        {"name": "Toyota", "description": "Great cars. Japanese technology"},
-    ]
-
-    car_make_instances = []
-    for data in car_make_data:
-        car_make_instances.append(
-             CarMake.objects.create(name=data['name'],
-                                    description=data['description']))
-
-    # Create CarModel instances with the corresponding CarMake instances
-    car_model_data = [
-        {"name": "Pathfinder", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[0]},
-        {"name": "Qashqai", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[0]},
-        {"name": "XTRAIL", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[0]},
-        {"name": "A-Class", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[1]},
-        {"name": "C-Class", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[1]},
-        {"name": "E-Class", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[1]},
-        {"name": "A4", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[2]},
-        {"name": "A5", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[2]},
-        {"name": "A6", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[2]},
-        {"name": "Sorrento", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[3]},
-        {"name": "Carnival", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[3]},
-        {"name": "Cerato", "type": "Sedan", "year": 2023,
-         "car_make": car_make_instances[3]},
-        {"name": "Corolla", "type": "Sedan", "year": 2023,
-         "car_make": car_make_instances[4]},
-        {"name": "Camry", "type": "Sedan", "year": 2023,
-         "car_make": car_make_instances[4]},
-        {"name": "Kluger", "type": "SUV", "year": 2023,
-         "car_make": car_make_instances[4]},
-        # Add more CarModel instances as needed
-    ]
-
-    for data in car_model_data:
-        CarModel.objects.create(name=data['name'],
-                                car_make=data['car_make'],
-                                type=data['type'],
-                                year=data['year'])
+import csv
+import json
+import os
+
+from django.db import transaction
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(__file__), 'data',
+                               'car_catalog.json')
+
+BATCH_SIZE = 1000
+
+
+def load_catalog(path=DEFAULT_CATALOG):
+    """ Reads a car catalog file.
+
+        A JSON file holds {"car_makes": [{"name", "description"}],
+        "car_models": [{"name", "car_make", "type", "year"}]}, where
+        "car_make" is the name of the make. A CSV file has one row per model
+        with the columns make, make_description, model, type, year. Types
+        are stored as the keys of CarModel.CAR_TYPES (SEDAN, SUV, WAGON),
+        whatever their case in the file.
+
+        Returns:
+            tuple: (car_makes, car_models) as lists of dictionaries in the
+                JSON layout.
+    """
+    if path.endswith('.csv'):
+        car_makes = {}
+        car_models = []
+        with open(path, newline='', encoding='utf-8') as catalog_file:
+            for row in csv.DictReader(catalog_file):
+                car_makes.setdefault(row['make'], {
+                    "name": row['make'],
+                    "description": row.get('make_description', '')})
+                car_models.append({"name": row['model'],
+                                   "car_make": row['make'],
+                                   "type": row['type'],
+                                   "year": int(row['year'])})
+        return list(car_makes.values()), car_models
+
+    with open(path, encoding='utf-8') as catalog_file:
+        catalog = json.load(catalog_file)
+    return catalog['car_makes'], catalog['car_models']
+
+
+def initiate(path=DEFAULT_CATALOG):
+    """ Inserts the car makes and models of a catalog file that are not in
+        the database yet.
+
+        Idempotent: makes are matched by name and models by make, name and
+        year, so running it again inserts nothing.
+
+        Args:
+            path (str): The catalog file, JSON or CSV.
+
+        Returns:
+            tuple: (makes_created, models_created).
+    """
+    from .models import CarMake, CarModel
+
+    car_make_data, car_model_data = load_catalog(path)
+
+    with transaction.atomic():
+        existing_makes = set(CarMake.objects.values_list('name', flat=True))
+        new_makes = []
+        for data in car_make_data:
+            if data['name'] in existing_makes:
+                continue
+            existing_makes.add(data['name'])
+            new_makes.append(CarMake(name=data['name'],
+                                     description=data['description']))
+        CarMake.objects.bulk_create(new_makes, batch_size=BATCH_SIZE)
+
+        make_ids = dict(CarMake.objects.values_list('name', 'id'))
+        existing_models = set(CarModel.objects.values_list(
+            'car_make_id', 'name', 'year'))
+        new_models = []
+        for data in car_model_data:
+            make_id = make_ids[data['car_make']]
+            model_key = (make_id, data['name'], int(data['year']))
+            if model_key in existing_models:
+                continue
+            existing_models.add(model_key)
+            new_models.append(CarModel(name=data['name'],
+                                       car_make_id=make_id,
+                                       type=data['type'].upper(),
+                                       year=data['year']))
+        CarModel.objects.bulk_create(new_models, batch_size=BATCH_SIZE)
+
+    if new_makes or new_models:
+        # bulk_create sends no post_save signals
+        from .catalog import invalidate_car_models_payload
+        transaction.on_commit(invalidate_car_models_payload)
+    return len(new_makes), len(new_models)
@@ -16,8 +16,11 @@ Flow:
            trigger an action on an external service.
         > 2. Current File (restapis.py): This file contains functions like
              `get_request` and `post_review`.
-        3. HTTP Request: These functions use the `requests` library to send
-           HTTP requests to external URLs.
+        3. HTTP Request: These functions send HTTP requests to external URLs
+           through shared keep-alive sessions (one connection pool per
+           downstream service, with timeouts and bounded retries). A circuit
+           breaker per downstream refuses calls to a failing service, and
+           the request's time budget caps each timeout (see breakers.py).
         4. External API Response: The external API processes the request and
            sends back a response (often JSON).
         5. Response Processing (in views.py): The view function then handle
@@ -25,11 +28,44 @@ Flow:
 """
 
 import requests
+import asyncio
+import contextvars
+import hashlib
+import httpx
+import logging
 import os
+import re
+import threading
+import time
+import unicodedata
+import weakref
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
+
+from .breakers import (BudgetExceededError, CircuitBreaker,
+                       CircuitOpenError, remaining_budget)
+from .cache import LRUCache, StaleWhileRevalidateCache
+from .geo import DealerIndex
+from .jsoncodec import dumps, loads
+from .metrics import observe_downstream, route_label
+
+try:
+    import nltk
+    from nltk.sentiment import SentimentIntensityAnalyzer
+except ImportError:
+    # In-process sentiment scoring is optional
+    nltk = None
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+# Request and response bodies, only written at DEBUG (see log.py)
+payload_logger = logging.getLogger('djangoapp.payloads')
+
 backend_url = os.getenv(
     'backend_url', default="http://localhost:3030")
 sentiment_analyzer_url = os.getenv(
@@ -39,21 +75,429 @@ searchcars_url = os.getenv(
     'searchcars_url',
     default="http://localhost:3050/")
 
+# HTTP client tuning, shared by every downstream call in this module
+http_connect_timeout = float(os.getenv(
+    'http_connect_timeout', default="3.05"))
+http_read_timeout = float(os.getenv(
+    'http_read_timeout', default="10"))
+http_max_retries = int(os.getenv(
+    'http_max_retries', default="2"))
+http_backoff_factor = float(os.getenv(
+    'http_backoff_factor', default="0.2"))
+# Statuses of idempotent requests that are retried (see `_call`)
+RETRY_STATUSES = (502, 503, 504)
 
-def searchcars_request(endpoint, **kwargs):
-    params = ""
-    if (kwargs):
-        for key, value in kwargs.items():
-            params = params + key + "=" + value + "&"
+# Request bodies are encoded by jsoncodec rather than the HTTP client
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Maximum number of keep-alive connections kept open to each downstream
+pool_sizes = {
+    'backend': int(os.getenv('backend_pool_size', default="10")),
+    'searchcars': int(os.getenv('searchcars_pool_size', default="10")),
+    'sentiment': int(os.getenv('sentiment_pool_size', default="20")),
+}
+
+# Circuit breakers: a downstream failing `breaker_failure_threshold` times in
+# a row is not called for `breaker_reset_timeout` seconds, after which
+# `breaker_half_open_calls` probe calls decide whether it has recovered.
+breaker_failure_threshold = int(os.getenv(
+    'breaker_failure_threshold', default="5"))
+breaker_reset_timeout = float(os.getenv(
+    'breaker_reset_timeout', default="30"))
+breaker_half_open_calls = int(os.getenv(
+    'breaker_half_open_calls', default="1"))
+
+breakers = {
+    downstream: CircuitBreaker(downstream,
+                               failure_threshold=breaker_failure_threshold,
+                               reset_timeout=breaker_reset_timeout,
+                               half_open_max_calls=breaker_half_open_calls)
+    for downstream in pool_sizes
+}
+
+# Concurrency and deadline for scoring the reviews of one dealer
+sentiment_max_workers = int(os.getenv(
+    'sentiment_max_workers', default="8"))
+sentiment_deadline = float(os.getenv(
+    'sentiment_deadline', default="3"))
+
+# Sentiment reported for reviews that could not be scored in time
+UNKNOWN_SENTIMENT = "unknown"
+
+# Where sentiment is scored: "remote" (the sentiment analyzer service),
+# "local" (in this process, with nltk and the lexicon bundled with the
+# service) or "auto" (remote, with texts it did not score in time scored
+# locally, when nltk is installed).
+sentiment_backend = os.getenv(
+    'sentiment_backend', default="auto")
+# Directory holding sentiment/vader_lexicon.zip for in-process scoring
+sentiment_lexicon_dir = os.getenv(
+    'sentiment_lexicon_dir',
+    default=os.path.join(os.path.dirname(__file__), 'microservices'))
+
+_local_analyzer = None
+_local_analyzer_lock = threading.Lock()
+
+# Sentiment result cache: an in-process LRU tier and an optional persistent
+# tier (a Django cache alias from settings.CACHES, e.g. "sentiment") that
+# survives worker restarts. An empty alias disables the persistent tier.
+sentiment_cache_size = int(os.getenv(
+    'sentiment_cache_size', default="10000"))
+sentiment_cache_ttl = float(os.getenv(
+    'sentiment_cache_ttl', default="86400"))
+sentiment_cache_alias = os.getenv(
+    'sentiment_cache_alias', default="")
+
+_sentiment_cache = LRUCache(maxsize=sentiment_cache_size,
+                            ttl=sentiment_cache_ttl)
+_sentiment_stats = {"persistent_hits": 0, "misses": 0}
+_sentiment_stats_lock = threading.Lock()
+
+# Dealer listing cache: fresh for `dealers_cache_ttl` seconds, then served
+# stale for up to `dealers_cache_stale_ttl` more while it is refreshed.
+dealers_cache_ttl = float(os.getenv(
+    'dealers_cache_ttl', default="300"))
+dealers_cache_stale_ttl = float(os.getenv(
+    'dealers_cache_stale_ttl', default="3600"))
+# Django cache alias shared by all workers, used to broadcast invalidations
+shared_cache_alias = os.getenv(
+    'shared_cache_alias', default="shared")
+
+# Nearest-dealer index, updated whenever the listing of all dealers loads
+_dealer_index = DealerIndex()
 
-    request_url = searchcars_url+endpoint+"?"+params
 
-    print("GET from {} ".format(request_url))
+def _on_dealers_refresh(state, dealers):
+    if state == "All" and isinstance(dealers, list):
+        added, removed = _dealer_index.update(dealers)
+        logger.debug("Dealer index updated",
+                     extra={"dealers": len(_dealer_index), "added": added,
+                            "removed": removed})
+
+
+_dealers_cache = StaleWhileRevalidateCache(ttl=dealers_cache_ttl,
+                                           stale_ttl=dealers_cache_stale_ttl,
+                                           on_refresh=_on_dealers_refresh)
+_dealers_generation = None
+_DEALERS_GENERATION_KEY = "dealers:generation"
+
+_adapters = {}
+_adapters_lock = threading.Lock()
+_local = threading.local()
+# Async clients are bound to the event loop that created them
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _new_adapter(pool_size):
+    """ Builds a transport adapter holding the connection pool for one
+        downstream.
+
+        The adapter itself never retries: `_call` does, so that every
+        attempt goes through the circuit breaker and gets a timeout capped
+        by what is left of the request's time budget.
+    """
+    return HTTPAdapter(pool_connections=1,
+                       pool_maxsize=pool_size,
+                       max_retries=0)
+
+
+def _session(downstream):
+    """ Returns a keep-alive session for the named downstream service.
+
+        The connection pool (adapter) of each downstream is created once per
+        process and shared by all threads; every thread gets its own
+        lightweight `requests.Session` on top of it, since sessions are not
+        safe to share between threads.
+
+        Args:
+            downstream (str): One of the keys of `pool_sizes`.
+
+        Returns:
+            requests.Session: A session reusing warm connections.
+    """
+    sessions = getattr(_local, 'sessions', None)
+    if sessions is None:
+        sessions = _local.sessions = {}
+    session = sessions.get(downstream)
+    if session is None:
+        adapter = _adapters.get(downstream)
+        if adapter is None:
+            with _adapters_lock:
+                adapter = _adapters.get(downstream)
+                if adapter is None:
+                    adapter = _new_adapter(pool_sizes[downstream])
+                    _adapters[downstream] = adapter
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        sessions[downstream] = session
+    return session
+
+
+def _timeout(read_timeout=None):
+    """ Returns the (connect, read) timeout used for downstream calls, capped
+        by what is left of the current request's time budget.
+
+        Raises:
+            BudgetExceededError: If the request has no time budget left.
+    """
+    if read_timeout is None:
+        read_timeout = http_read_timeout
+    connect_timeout = http_connect_timeout
+    read_timeout = min(read_timeout, http_read_timeout)
+    budget = remaining_budget()
+    if budget is not None:
+        connect_timeout = min(connect_timeout, budget)
+        read_timeout = min(read_timeout, budget)
+    return (connect_timeout, read_timeout)
+
+
+def _guarded(downstream):
+    """ Checks that a call to a downstream may be made now.
+
+        Returns:
+            CircuitBreaker: The breaker of the downstream, to record the
+                outcome of the call on.
+
+        Raises:
+            CircuitOpenError: If the downstream's breaker is open.
+    """
+    breaker = breakers[downstream]
+    if not breaker.allow():
+        raise CircuitOpenError(
+            "{} is unavailable (circuit open)".format(downstream))
+    return breaker
+
+
+def _record(breaker, status_code):
+    # Server errors count against the downstream, client errors do not
+    if status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+def _attempts(method):
+    """ Returns how many times a request may be sent.
+
+        Only idempotent methods (GET, HEAD, ...) are retried, on connection
+        errors, timeouts and `RETRY_STATUSES`. POST requests are sent exactly
+        once.
+    """
+    if method.upper() in Retry.DEFAULT_ALLOWED_METHODS:
+        return 1 + http_max_retries
+    return 1
+
+
+def _backoff(attempt):
+    """ Returns the seconds to wait before retry number `attempt`
+        (exponential backoff), or None if the request's time budget would
+        run out meanwhile.
+    """
+    delay = http_backoff_factor * (2 ** (attempt - 1))
     try:
-        response = requests.get(request_url)
-        return response.json()
+        budget = remaining_budget()
+    except BudgetExceededError:
+        return None
+    if budget is not None and delay >= budget:
+        return None
+    return delay
+
+
+def _call(downstream, method, url, read_timeout=None, route=None,
+          **kwargs):
+    """ Sends a request to a downstream through its keep-alive session, its
+        circuit breaker and the request's time budget, and records its
+        duration (see metrics.py).
+
+        Idempotent requests are retried (see `_attempts`). Each attempt is
+        allowed by the breaker, counted by it, and has its timeout capped by
+        what is left of the budget, so retries never outlast the budget.
+
+        Args:
+            downstream (str): One of the keys of `pool_sizes`.
+            method (str): The HTTP method.
+            url (str): The URL to request.
+            read_timeout (float, optional): As in `_timeout`.
+            route (str, optional): The route label of the call in the
+                metrics. Defaults to the URL path, with ids replaced.
+            **kwargs: Passed on to `requests.Session.request`.
+
+        Returns:
+            requests.Response: The response of the last attempt, whatever
+                its status.
+
+        Raises:
+            CircuitOpenError, BudgetExceededError: Without calling the
+                downstream.
+            requests.RequestException: On network errors and timeouts of
+                the last attempt.
+    """
+    route = route or route_label(urlsplit(url).path)
+    started = time.perf_counter()
+    response = error = None
+    for attempt in range(_attempts(method)):
+        if attempt:
+            delay = _backoff(attempt)
+            if delay is None:
+                break
+            time.sleep(delay)
+        try:
+            timeout = _timeout(read_timeout)
+            breaker = _guarded(downstream)
+        except (CircuitOpenError, BudgetExceededError):
+            if attempt:
+                break
+            observe_downstream(downstream, route, "rejected",
+                               time.perf_counter() - started)
+            raise
+        try:
+            response = _session(downstream).request(method, url,
+                                                    timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            breaker.record_failure()
+            response, error = None, e
+            continue
+        except Exception:
+            breaker.record_failure()
+            observe_downstream(downstream, route, "error",
+                               time.perf_counter() - started)
+            raise
+        except BaseException:
+            # Cancelled (client gone, wait_for timeout) or interrupted: says
+            # nothing about the downstream, but a probe must give its slot
+            # back or the breaker stays half-open and refuses every call
+            breaker.release()
+            raise
+        _record(breaker, response.status_code)
+        if response.status_code not in RETRY_STATUSES:
+            break
+    if response is None:
+        observe_downstream(downstream, route, "error",
+                           time.perf_counter() - started)
+        raise error
+    observe_downstream(downstream, route, response.status_code,
+                       time.perf_counter() - started)
+    return response
+
+
+async def _async_call(downstream, method, url, read_timeout=None,
+                      route=None, **kwargs):
+    """ Async variant of `_call`, through the downstream's async client. """
+    route = route or route_label(urlsplit(url).path)
+    started = time.perf_counter()
+    response = error = None
+    for attempt in range(_attempts(method)):
+        if attempt:
+            delay = _backoff(attempt)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        try:
+            connect_timeout, timeout = _timeout(read_timeout)
+            breaker = _guarded(downstream)
+        except (CircuitOpenError, BudgetExceededError):
+            if attempt:
+                break
+            observe_downstream(downstream, route, "rejected",
+                               time.perf_counter() - started)
+            raise
+        try:
+            response = await _async_client(downstream).request(
+                method, url,
+                timeout=httpx.Timeout(timeout, connect=connect_timeout),
+                **kwargs)
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            response, error = None, e
+            continue
+        except Exception:
+            breaker.record_failure()
+            observe_downstream(downstream, route, "error",
+                               time.perf_counter() - started)
+            raise
+        except BaseException:
+            # Cancelled (client gone, wait_for timeout) or interrupted: says
+            # nothing about the downstream, but a probe must give its slot
+            # back or the breaker stays half-open and refuses every call
+            breaker.release()
+            raise
+        _record(breaker, response.status_code)
+        if response.status_code not in RETRY_STATUSES:
+            break
+    if response is None:
+        observe_downstream(downstream, route, "error",
+                           time.perf_counter() - started)
+        raise error
+    observe_downstream(downstream, route, response.status_code,
+                       time.perf_counter() - started)
+    return response
+
+
+def downstream_status():
+    """ Returns the circuit breaker state of each downstream service.
+
+        Returns:
+            dict: By downstream name, its breaker "state" ("closed", "open"
+                or "half_open"), consecutive "failures", calls "rejected"
+                since startup and, when open, the seconds until it is probed
+                again ("retry_in").
+    """
+    return {downstream: breaker.status()
+            for downstream, breaker in breakers.items()}
+
+
+def _async_client(downstream):
+    """ Returns the keep-alive async HTTP client for the named downstream
+        service on the running event loop.
+
+        Under an ASGI server the loop lives as long as the worker, so its
+        connections are reused by every request the worker serves. Clients
+        are never closed, so this is only called from the async views
+        served under ASGI (settings.ASYNC_VIEWS); under WSGI, each request
+        would leave a client behind on its own short-lived loop.
+
+        Args:
+            downstream (str): One of the keys of `pool_sizes`.
+
+        Returns:
+            httpx.AsyncClient: A client reusing warm connections.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.get(loop)
+    if clients is None:
+        clients = _async_clients[loop] = {}
+    client = clients.get(downstream)
+    if client is None:
+        limits = httpx.Limits(
+            max_connections=pool_sizes[downstream],
+            max_keepalive_connections=pool_sizes[downstream])
+        client = httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(http_read_timeout,
+                                  connect=http_connect_timeout),
+            transport=httpx.AsyncHTTPTransport(limits=limits))
+        clients[downstream] = client
+    return client
+
+
+_sentiment_executor = ThreadPoolExecutor(
+    max_workers=sentiment_max_workers,
+    thread_name_prefix='sentiment')
+
+
+def searchcars_request(endpoint, **kwargs):
+    request_url = searchcars_url+endpoint
+
+    logger.debug("GET from %s", request_url,
+                 extra={"downstream": "searchcars"})
+    try:
+        response = _call('searchcars', 'GET', request_url, params=kwargs)
+        return loads(response.content)
     except Exception as e:
-        print(f'Exception occurred: {e}')
+        logger.warning("Downstream request failed",
+                       extra={"downstream": "searchcars",
+                              "url": request_url, "error": str(e)})
 
 
 def get_request(endpoint, **kwargs):
@@ -63,22 +507,428 @@ def get_request(endpoint, **kwargs):
         Returns:
             the JSON response or None on network error.
     """
-    params = ""
-    if (kwargs):
-        for key, value in kwargs.items():
-            params = params + key + "=" + value + "&"
+    request_url = backend_url+endpoint
+
+    logger.debug("GET from %s", request_url, extra={"downstream": "backend"})
+    try:
+        response = _call('backend', 'GET', request_url, params=kwargs)
+        return loads(response.content)
+    except Exception as e:
+        logger.warning("Downstream request failed",
+                       extra={"downstream": "backend",
+                              "url": request_url, "error": str(e)})
+
+
+async def async_searchcars_request(endpoint, **kwargs):
+    """ Async variant of `searchcars_request`.
+
+        Returns:
+            the JSON response or None on network error.
+    """
+    request_url = searchcars_url+endpoint
+
+    logger.debug("GET from %s", request_url,
+                 extra={"downstream": "searchcars"})
+    try:
+        response = await _async_call('searchcars', 'GET', request_url,
+                                     params=kwargs)
+        return loads(response.content)
+    except Exception as e:
+        logger.warning("Downstream request failed",
+                       extra={"downstream": "searchcars",
+                              "url": request_url, "error": str(e)})
+
+
+async def async_get_request(endpoint, **kwargs):
+    """ Async variant of `get_request`.
+
+        Returns:
+            the JSON response or None on network error.
+    """
+    request_url = backend_url+endpoint
+
+    logger.debug("GET from %s", request_url, extra={"downstream": "backend"})
+    try:
+        response = await _async_call('backend', 'GET', request_url,
+                                     params=kwargs)
+        return loads(response.content)
+    except Exception as e:
+        logger.warning("Downstream request failed",
+                       extra={"downstream": "backend",
+                              "url": request_url, "error": str(e)})
+
+
+def search_inventory(dealer_id, query):
+    """ Searches a dealer's inventory with the searchcars service's
+        "/carsearch" endpoint, which applies every filter of the query, its
+        sorting and its limit/offset in one database query.
+
+        Args:
+            dealer_id (int): The ID of the dealer.
+            query (dict): A query built by `parse_inventory_query`.
+
+        Returns:
+            dict: {"total": int, "cars": list}, or None on network error.
+    """
+    return searchcars_request("/carsearch/"+str(dealer_id), **query)
+
+
+async def async_search_inventory(dealer_id, query):
+    """ Async variant of `search_inventory`. """
+    return await async_searchcars_request("/carsearch/"+str(dealer_id),
+                                          **query)
+
+
+def iter_inventory(dealer_id, query, page_size=100):
+    """ Yields the cars matching an inventory query, fetching them from the
+        searchcars service one page at a time so that only one page is held
+        in memory.
+
+        Args:
+            dealer_id (int): The ID of the dealer.
+            query (dict): A query built by `parse_inventory_query`. Its own
+                limit/offset, if any, bound the cars yielded.
+            page_size (int): Cars fetched per downstream request.
+    """
+    offset = query.get('offset', 0)
+    remaining = query.get('limit')
+    while remaining is None or remaining > 0:
+        limit = page_size if remaining is None else min(page_size, remaining)
+        page = search_inventory(dealer_id, dict(query, offset=offset,
+                                                limit=limit))
+        cars = (page or {}).get('cars') or []
+        yield from cars
+        if len(cars) < limit:
+            return
+        offset += len(cars)
+        if remaining is not None:
+            remaining -= len(cars)
 
-    request_url = backend_url+endpoint+"?"+params
 
-    print("GET from {} ".format(request_url))
+def _dealers_endpoint(state):
+    if (state == "All"):
+        return "/fetchDealers/"
+    return "/fetchDealers/"+state
+
+
+def _sync_dealers_generation():
+    """ Drops this worker's cached dealer listings if another process has
+        invalidated them since they were loaded.
+    """
+    global _dealers_generation
     try:
-        response = requests.get(request_url)
-        return response.json()
+        from django.core.cache import caches
+        generation = caches[shared_cache_alias].get(_DEALERS_GENERATION_KEY)
     except Exception as e:
-        print(f"Network exception occurred: {e}")
+        logger.warning("Dealer cache unavailable", extra={"error": str(e)})
+        return
+    if generation != _dealers_generation:
+        _dealers_cache.invalidate()
+        _dealers_generation = generation
+
+
+def get_dealers(state="All"):
+    """ Returns the dealerships, optionally filtered by state, from the dealer
+        cache or the backend's "/fetchDealers" endpoints.
+
+        Args:
+            state (str): A state name, or "All" for every dealership.
+
+        Returns:
+            list: The dealerships, or None on network error with nothing
+                cached.
+    """
+    _sync_dealers_generation()
+    endpoint = _dealers_endpoint(state)
+    return _dealers_cache.get(state, lambda: get_request(endpoint))
+
 
+async def async_get_dealers(state="All"):
+    """ Async variant of `get_dealers`.
+
+        A cached (possibly stale) listing is returned without waiting;
+        otherwise the backend is called asynchronously.
+    """
+    await sync_to_async(_sync_dealers_generation,
+                        thread_sensitive=False)()
+    endpoint = _dealers_endpoint(state)
+    dealers = _dealers_cache.peek(state, lambda: get_request(endpoint))
+    if dealers is None:
+        dealers = await async_get_request(endpoint)
+        _dealers_cache.set(state, dealers)
+    return dealers
+
+
+def nearest_dealers(lat, long, k, radius_km=None):
+    """ Returns the dealers nearest to a location, from the dealer index.
+
+        The listing of all dealers is read through `get_dealers`, so a
+        stale or invalidated listing is reloaded, and the index updated,
+        first.
+
+        Args:
+            lat (float), long (float): The location, in degrees.
+            k (int): The most dealers to return.
+            radius_km (float, optional): Only dealers within this distance
+                are returned.
+
+        Returns:
+            list: (distance in km, dealer) pairs, nearest first, or None on
+                network error with no dealers cached.
+    """
+    if get_dealers("All") is None:
+        return None
+    return _dealer_index.nearest(lat, long, k, radius_km)
+
+
+async def async_nearest_dealers(lat, long, k, radius_km=None):
+    """ Async variant of `nearest_dealers`. """
+    if await async_get_dealers("All") is None:
+        return None
+    return _dealer_index.nearest(lat, long, k, radius_km)
 
-def analyze_review_sentiments(text):
+
+def invalidate_dealers(state=None):
+    """ Drops cached dealer listings after dealer data changed.
+
+        The listings of this process are dropped at once; other workers drop
+        theirs on their next read, through a generation number kept in the
+        shared Django cache.
+
+        Args:
+            state (str, optional): In this process, only drop the listings
+                of this state and of all states. Other workers drop all of
+                their listings. Defaults to every listing.
+    """
+    global _dealers_generation
+    if state is None:
+        _dealers_cache.invalidate()
+    else:
+        _dealers_cache.invalidate(state)
+        _dealers_cache.invalidate("All")
+    try:
+        from django.core.cache import caches
+        generation = os.urandom(8).hex()
+        caches[shared_cache_alias].set(_DEALERS_GENERATION_KEY, generation,
+                                       timeout=None)
+        _dealers_generation = generation
+    except Exception as e:
+        logger.warning("Dealer cache unavailable", extra={"error": str(e)})
+
+
+def _sentiment_key(text):
+    """ Returns the cache key of a text: a hash of its normalized form.
+
+        Normalization only unifies the Unicode form and whitespace; case and
+        punctuation are kept because VADER scores them.
+    """
+    normalized = unicodedata.normalize('NFC', text)
+    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    return "sentiment:" + digest
+
+
+def _persistent_sentiment_cache():
+    if not sentiment_cache_alias:
+        return None
+    from django.core.cache import caches
+    return caches[sentiment_cache_alias]
+
+
+def _cached_sentiments(keys):
+    """ Looks keys up in the in-process tier, then in the persistent tier.
+
+        Returns:
+            dict: The sentiment labels found, by key.
+    """
+    found = {}
+    missing = []
+    for key in keys:
+        sentiment = _sentiment_cache.get(key)
+        if sentiment is None:
+            missing.append(key)
+        else:
+            found[key] = sentiment
+
+    stored = {}
+    persistent = _persistent_sentiment_cache()
+    if missing and persistent is not None:
+        try:
+            stored = persistent.get_many(missing)
+        except Exception as e:
+            logger.warning("Sentiment cache unavailable",
+                           extra={"error": str(e)})
+        for key, sentiment in stored.items():
+            _sentiment_cache.set(key, sentiment)
+            found[key] = sentiment
+
+    with _sentiment_stats_lock:
+        _sentiment_stats["persistent_hits"] += len(stored)
+        _sentiment_stats["misses"] += len(missing) - len(stored)
+    return found
+
+
+def _store_sentiments(sentiments):
+    """ Stores sentiment labels, by key, in both cache tiers. Unknown
+        sentiments are not cached so that they are retried.
+    """
+    sentiments = {key: sentiment for key, sentiment in sentiments.items()
+                  if sentiment and sentiment != UNKNOWN_SENTIMENT}
+    for key, sentiment in sentiments.items():
+        _sentiment_cache.set(key, sentiment)
+    persistent = _persistent_sentiment_cache()
+    if sentiments and persistent is not None:
+        try:
+            persistent.set_many(sentiments, timeout=sentiment_cache_ttl)
+        except Exception as e:
+            logger.warning("Sentiment cache unavailable",
+                           extra={"error": str(e)})
+
+
+def sentiment_cache_stats():
+    """ Returns hit and miss counters of the sentiment cache.
+
+        Returns:
+            dict: "hits" (in-process tier), "persistent_hits", "misses"
+                (texts that had to be sent to the sentiment service) and the
+                in-process tier "size" and "maxsize".
+    """
+    stats = _sentiment_cache.stats()
+    with _sentiment_stats_lock:
+        stats["persistent_hits"] = _sentiment_stats["persistent_hits"]
+        stats["misses"] = _sentiment_stats["misses"]
+    return stats
+
+
+def _sentiment_analyzer():
+    """ Returns the in-process VADER analyzer, loading it on first use.
+
+        Returns:
+            SentimentIntensityAnalyzer: The analyzer, or None if nltk or the
+                lexicon is not available.
+    """
+    global _local_analyzer
+    if _local_analyzer is None and nltk is not None:
+        with _local_analyzer_lock:
+            if _local_analyzer is None:
+                if sentiment_lexicon_dir not in nltk.data.path:
+                    nltk.data.path.append(sentiment_lexicon_dir)
+                try:
+                    _local_analyzer = SentimentIntensityAnalyzer()
+                except LookupError as e:
+                    logger.warning("Sentiment lexicon not found",
+                                   extra={"error": str(e)})
+                    _local_analyzer = False
+    return _local_analyzer or None
+
+
+def classify_sentiment(text):
+    """ Scores a text in process, with the rule of the sentiment analyzer
+        service (microservices/app.py), which gives the same labels.
+
+        Returns:
+            str: "positive", "negative" or "neutral", or `UNKNOWN_SENTIMENT`
+                if in-process scoring is not available.
+    """
+    analyzer = _sentiment_analyzer()
+    if analyzer is None:
+        return UNKNOWN_SENTIMENT
+    scores = analyzer.polarity_scores(text)
+    pos = float(scores['pos'])
+    neg = float(scores['neg'])
+    neu = float(scores['neu'])
+    res = "positive"
+    if (neg > pos and neg > neu):
+        res = "negative"
+    elif (neu > neg and neu > pos):
+        res = "neutral"
+    return res
+
+
+def _score_sentiments(texts):
+    """ Scores texts with the configured `sentiment_backend`.
+
+        Returns:
+            list: One sentiment label per text, `UNKNOWN_SENTIMENT` for the
+                texts that could not be scored.
+    """
+    if sentiment_backend == 'local':
+        return [classify_sentiment(text) for text in texts]
+    scored = analyze_review_sentiments_batch(texts, sentiment_deadline)
+    if scored is None:
+        # A service without the batch endpoint; it answered at once, so
+        # the per-text requests still have the deadline to run
+        scored = analyze_reviews_sentiments(texts)
+    if sentiment_backend == 'auto':
+        scored = [classify_sentiment(text) if sentiment == UNKNOWN_SENTIMENT
+                  else sentiment
+                  for text, sentiment in zip(texts, scored)]
+    return scored
+
+
+def get_review_sentiments(texts):
+    """ Returns the sentiment of each text, using the sentiment cache and
+        scoring only the texts it has not seen.
+
+        Distinct uncached texts are scored in one batch request under the
+        sentiment deadline; only if the service has no batch endpoint, they
+        are scored with concurrent per-text requests instead. Depending on
+        `sentiment_backend`, texts are instead scored in process, or the
+        texts the service did not score in time are. Texts that could not
+        be scored get `UNKNOWN_SENTIMENT`.
+
+        Args:
+            texts (list): The texts to analyze.
+
+        Returns:
+            list: One sentiment label per text, in the order of `texts`.
+    """
+    keys = [_sentiment_key(text) for text in texts]
+    sentiments = _cached_sentiments(list(dict.fromkeys(keys)))
+
+    # Score each distinct uncached text once
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key not in sentiments:
+            pending.setdefault(key, text)
+    if pending:
+        scored = _score_sentiments(list(pending.values()))
+        scored = dict(zip(pending.keys(), scored))
+        _store_sentiments(scored)
+        sentiments.update(scored)
+    return [sentiments[key] for key in keys]
+
+
+def analyze_review_sentiments(text, timeout=None):
+    """ Returns the sentiment of a text, from the sentiment cache or by
+        sending a GET request to the sentiment analyzer microservice (or by
+        scoring it in process, see `sentiment_backend`)
+
+        Args:
+            text (str): The text to analyze.
+            timeout (float, optional): Read timeout in seconds, capped by
+                `http_read_timeout`.
+
+        Returns:
+            the JSON response or None on error.
+    """
+    key = _sentiment_key(text)
+    sentiment = _cached_sentiments([key]).get(key)
+    if sentiment is not None:
+        return {"sentiment": sentiment}
+    response = None
+    if sentiment_backend != 'local':
+        response = _request_sentiment(text, timeout)
+    if response is None and sentiment_backend != 'remote':
+        sentiment = classify_sentiment(text)
+        if sentiment != UNKNOWN_SENTIMENT:
+            response = {"sentiment": sentiment}
+    if isinstance(response, dict):
+        _store_sentiments({key: response.get('sentiment')})
+    return response
+
+
+def _request_sentiment(text, timeout=None):
     """ Sends a GET request to the sentiment analyzer microservice for
         text analysis
 
@@ -88,11 +938,100 @@ def analyze_review_sentiments(text):
     request_url = sentiment_analyzer_url+"analyze/"+text
     try:
         # Call get method of requests library with URL and parameters
-        response = requests.get(request_url)
-        return response.json()
+        response = _call('sentiment', 'GET', request_url, timeout,
+                         route="/analyze")
+        return loads(response.content)
+    except Exception as err:
+        logger.warning("Sentiment request failed",
+                       extra={"downstream": "sentiment",
+                              "error": repr(err)})
+
+
+def analyze_review_sentiments_batch(texts, timeout=None):
+    """ Sends a POST request to the sentiment analyzer's "/analyze_batch"
+        endpoint to analyze many texts in one round trip.
+
+        Args:
+            texts (list): The texts to analyze.
+            timeout (float, optional): Read timeout in seconds, capped by
+                `http_read_timeout`. Defaults to `sentiment_deadline`.
+
+        Returns:
+            list: One sentiment label per text, in the order of `texts`;
+                `UNKNOWN_SENTIMENT` for every text if the request failed or
+                timed out. None if the sentiment service has no batch
+                endpoint (404 or 405).
+    """
+    if timeout is None:
+        timeout = sentiment_deadline
+    request_url = sentiment_analyzer_url+"analyze_batch"
+    try:
+        response = _call('sentiment', 'POST', request_url, timeout,
+                         data=dumps(list(texts)), headers=JSON_HEADERS)
+        if response.status_code in (404, 405):
+            logger.info("Sentiment service has no batch endpoint",
+                        extra={"downstream": "sentiment"})
+            return None
+        response.raise_for_status()
+        sentiments = loads(response.content)['sentiments']
+        if len(sentiments) != len(texts):
+            raise ValueError("expected {} sentiments, got {}".format(
+                len(texts), len(sentiments)))
+        return [sentiment or UNKNOWN_SENTIMENT for sentiment in sentiments]
     except Exception as err:
-        print(f"Unexpected {err=}, {type(err)=}")
-        print("Network exception occurred")
+        logger.warning("Sentiment batch request failed",
+                       extra={"downstream": "sentiment",
+                              "texts": len(texts), "error": repr(err)})
+        return [UNKNOWN_SENTIMENT] * len(texts)
+
+
+def analyze_reviews_sentiments(texts, deadline=None):
+    """ Analyzes the sentiment of several texts concurrently.
+
+        Requests are spread over a bounded pool of worker threads and share
+        one deadline, capped by the request's time budget. Texts whose
+        sentiment has not arrived when the deadline expires, or whose request
+        failed, get `UNKNOWN_SENTIMENT`. Nothing is sent while the sentiment
+        service's circuit breaker is open.
+
+        Args:
+            texts (list): The texts to analyze.
+            deadline (float, optional): Seconds to wait for all results.
+                Defaults to `sentiment_deadline`.
+
+        Returns:
+            list: One sentiment label per text, in the order of `texts`.
+    """
+    if deadline is None:
+        deadline = sentiment_deadline
+    try:
+        budget = remaining_budget()
+    except BudgetExceededError:
+        return [UNKNOWN_SENTIMENT] * len(texts)
+    if budget is not None:
+        deadline = min(deadline, budget)
+    if breakers['sentiment'].is_open():
+        return [UNKNOWN_SENTIMENT] * len(texts)
+    # Each request runs in a copy of the caller's context, so that it is
+    # counted in the caller's Server-Timing header
+    futures = [_sentiment_executor.submit(contextvars.copy_context().run,
+                                          _request_sentiment, text, deadline)
+               for text in texts]
+    done, not_done = wait(futures, timeout=deadline)
+    for future in not_done:
+        # Drop requests that have not started yet; running ones finish
+        # within their own read timeout.
+        future.cancel()
+
+    sentiments = []
+    for future in futures:
+        sentiment = None
+        if future in done and future.exception() is None:
+            response = future.result()
+            if isinstance(response, dict):
+                sentiment = response.get('sentiment')
+        sentiments.append(sentiment or UNKNOWN_SENTIMENT)
+    return sentiments
 
 
 def _post_review(data_dict):
@@ -118,30 +1057,35 @@ def _post_review(data_dict):
     response = None
     try:
         response: requests.post(request_url, json=data_dict)
-        print(response.json())
-        return response.json()
+        payload_logger.debug("Review stored",
+                             extra={"payload": loads(response.content)})
+        return loads(response.content)
     except Exception as e:
-        print(f"Network exception occurred: {e}")
+        logger.warning("Downstream request failed",
+                       extra={"downstream": "backend",
+                              "url": request_url, "error": str(e)})
         return None
 
 
-# DEBUG
 def post_review(data_dict):
     """Sends a POST request to the backend URL's "/insert_review" endpoint...
 
     ... (rest of your docstring) ...
     """
     request_url = backend_url + "/insert_review"
-    # Added debug print
-    print(f"DEBUG: post_review called with data: {data_dict}")
-    print(f"DEBUG: request_url: {request_url}")
+    logger.debug("POST to %s", request_url, extra={"downstream": "backend"})
+    payload_logger.debug("Review submitted", extra={"payload": data_dict})
     try:
-        response = requests.post(request_url, json=data_dict)
+        response = _call('backend', 'POST', request_url,
+                         data=dumps(data_dict), headers=JSON_HEADERS)
         # Raise an exception for bad status codes
         response.raise_for_status()
-        # print status code
-        print(f"DEBUG: response.status_code: {response.status_code}")
-        print(response.json())
-        return response.json()
+        review = loads(response.content)
+        payload_logger.debug("Review stored",
+                             extra={"status_code": response.status_code,
+                                    "payload": review})
+        return review
     except Exception as e:
-        print(f"Network exception occurred: {e}")
+        logger.warning("Downstream request failed",
+                       extra={"downstream": "backend",
+                              "url": request_url, "error": str(e)})
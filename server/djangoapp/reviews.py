@@ -0,0 +1,144 @@
+""" Stores review sentiment once, when a review is written, and joins it
+    back on reads.
+
+    A review's text never changes after `post_review` stores it, so its
+    sentiment is computed when it is submitted through `add_review` (or by
+    the `backfill_review_sentiments` command for older reviews) and kept in
+    the ReviewSentiment table, keyed by the backend's review id along with
+    a hash of the text it was computed for. Reads only call the sentiment
+    analyzer for reviews that are not stored yet, or whose stored hash does
+    not match because the backend reused the id for another review (its
+    ids restart when it is reseeded); those rows are overwritten.
+
+Flow:
+    Review Sentiment: Persists and looks up the sentiment of reviews.
+
+    Flow:
+        1. View Function Call (in views.py): `add_review` stores the new
+           review; `get_dealer_reviews` needs the sentiment of each review.
+        > 2. Current File (reviews.py): Stored sentiments are read from the
+             ReviewSentiment table in one query.
+        3. Sentiment Analysis (in restapis.py): Reviews without a stored
+           sentiment are scored (cache, batch or concurrent requests) and the
+           results are stored for the next read.
+"""
+
+import hashlib
+
+from .models import ReviewSentiment
+from .restapis import UNKNOWN_SENTIMENT, get_review_sentiments
+
+BATCH_SIZE = 500
+
+
+def text_hash(text):
+    """ Returns the hash identifying the text a sentiment was computed for.
+    """
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def _stored(reviews):
+    """ Returns the stored sentiment of each review by id, for the reviews
+        whose stored text hash matches their text.
+    """
+    ids = [review['id'] for review in reviews if review.get('id') is not None]
+    rows = ReviewSentiment.objects.filter(review_id__in=ids).values_list(
+        'review_id', 'text_hash', 'sentiment')
+    hashes = {review['id']: text_hash(review.get('review'))
+              for review in reviews if review.get('id') is not None}
+    return {review_id: sentiment for review_id, stored_hash, sentiment in rows
+            if stored_hash == hashes[review_id]}
+
+
+def _store(scored):
+    """ Stores the sentiment of reviews, replacing the rows of their ids,
+        and skipping unknown sentiments and reviews without an id.
+
+        Args:
+            scored (list): (review, sentiment) pairs.
+
+        Returns:
+            int: The number of sentiments stored.
+    """
+    rows = {}
+    for review, sentiment in scored:
+        if (review.get('id') is not None and sentiment
+                and sentiment != UNKNOWN_SENTIMENT):
+            rows[review['id']] = ReviewSentiment(
+                review_id=review['id'],
+                text_hash=text_hash(review.get('review')),
+                sentiment=sentiment)
+    ReviewSentiment.objects.bulk_create(
+        rows.values(), batch_size=BATCH_SIZE, update_conflicts=True,
+        unique_fields=['review_id'], update_fields=['text_hash', 'sentiment'])
+    return len(rows)
+
+
+def review_sentiments(reviews):
+    """ Returns the sentiment of each review, from the ReviewSentiment table
+        or, for reviews not stored yet, from the sentiment analyzer.
+
+        Args:
+            reviews (list): Review dictionaries from the backend, with "id"
+                and "review" keys.
+
+        Returns:
+            list: One sentiment label per review, in the order of `reviews`.
+    """
+    stored = _stored(reviews)
+
+    sentiments = [stored.get(review.get('id')) for review in reviews]
+    missing = [index for index, sentiment in enumerate(sentiments)
+               if sentiment is None]
+    if missing:
+        scored = get_review_sentiments([reviews[index]['review']
+                                        for index in missing])
+        for index, sentiment in zip(missing, scored):
+            sentiments[index] = sentiment
+        _store([(reviews[index], sentiment)
+                for index, sentiment in zip(missing, scored)])
+    return sentiments
+
+
+def store_review_sentiment(review):
+    """ Computes and stores the sentiment of a review the backend has just
+        saved.
+
+        Args:
+            review (dict): The saved review, as returned by `post_review`.
+
+        Returns:
+            str: The sentiment label.
+    """
+    sentiment = get_review_sentiments([review['review']])[0]
+    _store([(review, sentiment)])
+    return sentiment
+
+
+def backfill_review_sentiments(reviews, chunk_size=100):
+    """ Stores the sentiment of reviews that have none stored yet, or one
+        stored for another text.
+
+        Args:
+            reviews (list): Review dictionaries with "id" and "review" keys.
+            chunk_size (int): Reviews scored per sentiment request.
+
+        Returns:
+            dict: Counts of "stored" reviews, reviews "skipped" because
+                they were already stored, and "unknown" ones that could not
+                be scored.
+    """
+    counts = {"stored": 0, "skipped": 0, "unknown": 0}
+    for start in range(0, len(reviews), chunk_size):
+        chunk = reviews[start:start + chunk_size]
+        existing = _stored(chunk)
+        pending = [review for review in chunk if review['id'] not in existing]
+        counts["skipped"] += len(chunk) - len(pending)
+        if not pending:
+            continue
+        scored = get_review_sentiments([review['review']
+                                        for review in pending])
+        stored = _store(list(zip(pending, scored)))
+        counts["stored"] += stored
+        counts["unknown"] += len(pending) - stored
+    return counts
@@ -0,0 +1,32 @@
+""" Flow
+    Signal Receivers: Reacts to changes of the car catalog models.
+
+    Flow:
+        1. Data Change: A CarMake or CarModel is saved or deleted (admin,
+           shell, management command).
+        > 2. Current File (signals.py): The receivers below are called by
+             Django's post_save/post_delete signals.
+        3. Cache Invalidation (in catalog.py): Once the change is committed,
+           the cached `get_cars` payload is dropped and rebuilt on the next
+           request.
+
+    Note: `bulk_create`/`update()` do not send these signals; code using them
+    calls `invalidate_car_models_payload()` itself.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import invalidate_car_models_payload
+from .models import CarMake, CarModel
+
+
+@receiver(post_save, sender=CarMake)
+@receiver(post_delete, sender=CarMake)
+@receiver(post_save, sender=CarModel)
+@receiver(post_delete, sender=CarModel)
+def invalidate_catalog(sender, **kwargs):
+    # Invalidating before the commit would let a concurrent request rebuild
+    # the payload from the old rows under the new generation
+    transaction.on_commit(invalidate_car_models_payload)
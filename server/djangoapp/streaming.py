@@ -0,0 +1,93 @@
+""" Streams list responses as newline-delimited JSON (NDJSON).
+
+    Clients opt in with the query parameter `stream=ndjson` or the header
+    `Accept: application/x-ndjson`. Each record is written on its own line as
+    soon as it is available, so worker memory stays bounded and the frontend
+    can render while the rest is still being fetched or scored.
+
+Flow:
+    Streaming Responses: Sends records as they are produced.
+
+    Flow:
+        1. View Function Call (in views.py): A list view sees that the client
+           asked for a stream.
+        > 2. Current File (streaming.py): The view's record generator is
+             wrapped in a StreamingHttpResponse that serializes one record
+             per line.
+        3. HTTP Response: Django sends every line to the client as the
+           generator yields it.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.http import StreamingHttpResponse
+
+from .jsoncodec import dumps
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request):
+    """ Returns True if the client asked for an NDJSON stream. """
+    return (request.GET.get('stream') == 'ndjson'
+            or NDJSON_CONTENT_TYPE in request.headers.get('Accept', ''))
+
+
+def _lines(records):
+    for record in records:
+        yield dumps(record) + b"\n"
+
+
+async def _async_lines(records):
+    # Records are produced by blocking code (HTTP calls, ORM cursors), which
+    # runs in a thread of its own for the whole stream: not Django's shared
+    # sync thread, where a long stream would hold up every other request's
+    # sync work, and always the same one, as an ORM cursor belongs to the
+    # database connection of the thread that opened it.
+    lines = _lines(records)
+    executor = ThreadPoolExecutor(max_workers=1,
+                                  thread_name_prefix='ndjson-stream')
+    produce = sync_to_async(next, thread_sensitive=False, executor=executor)
+    try:
+        while True:
+            line = await produce(lines, None)
+            if line is None:
+                return
+            yield line
+    finally:
+        await sync_to_async(_close, thread_sensitive=False,
+                            executor=executor)(lines)
+        executor.shutdown(wait=False)
+
+
+def _close(lines):
+    # Runs in the stream's thread: stops the records early if the client
+    # went away, then closes the database connections the thread opened
+    lines.close()
+    connections.close_all()
+
+
+def ndjson_response(records, asynchronous=False):
+    """ Builds a streaming NDJSON response from an iterable of records.
+
+        Args:
+            records (iterable): JSON-serializable records, typically a
+                generator that fetches or scores them lazily.
+            asynchronous (bool): True when returned from an async view under
+                ASGI, so that the records are consumed without blocking the
+                event loop.
+
+        Returns:
+            StreamingHttpResponse: One JSON record per line.
+    """
+    if asynchronous:
+        content = _async_lines(records)
+    else:
+        content = _lines(records)
+    response = StreamingHttpResponse(content,
+                                     content_type=NDJSON_CONTENT_TYPE)
+    # Ask reverse proxies to pass lines through without buffering
+    response['X-Accel-Buffering'] = 'no'
+    return response
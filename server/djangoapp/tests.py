@@ -0,0 +1,816 @@
+""" Tests of djangoapp.
+
+    Run from the server directory with `python manage.py test djangoapp`.
+    Downstream services are replaced by local sockets; nothing outside this
+    process is called.
+"""
+
+import asyncio
+import math
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core import signing
+from django.core.cache import caches
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         TransactionTestCase, override_settings)
+from django.urls import reverse
+
+from . import restapis, views
+from .cache import LRUCache
+from .breakers import (BudgetExceededError, CircuitBreaker,
+                       CircuitOpenError, end_budget, remaining_budget,
+                       start_budget)
+from .catalog import (car_models_payload, invalidate_car_models_payload,
+                      parse_catalog_query, search_car_models)
+from .geo import (DealerIndex, chord_to_km, parse_nearby_query,
+                  unit_vector)
+from .inventory import sync_inventory_records
+from .jsoncodec import loads
+from .models import CarMake, CarModel, InventoryCar, ReviewSentiment
+from .pagination import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor,
+                         encode_cursor, page_info, requested_page)
+from .reviews import review_sentiments, text_hash
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    # Answers every request with the status of the server, counting them
+    def do_GET(self):
+        self.server.hits += 1
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Downstream:
+    """ A local downstream answering `status`, or never answering if
+        `status` is None.
+    """
+
+    def __init__(self, status=None):
+        if status is None:
+            self._socket = socket.socket()
+            self._socket.bind(('127.0.0.1', 0))
+            self._socket.listen(16)
+            self.port = self._socket.getsockname()[1]
+            self._server = None
+        else:
+            self._server = ThreadingHTTPServer(('127.0.0.1', 0),
+                                               _StatusHandler)
+            self._server.status = status
+            self._server.hits = 0
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            threading.Thread(target=self._server.serve_forever,
+                             daemon=True).start()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}/".format(self.port)
+
+    @property
+    def hits(self):
+        return self._server.hits
+
+    def close(self):
+        if self._server is None:
+            self._socket.close()
+        else:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('djangoapp.breakers.time.monotonic',
+                             lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('test', failure_threshold=3,
+                                      reset_timeout=10)
+
+    def fail(self, times):
+        for _ in range(times):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(2)
+        self.breaker.record_success()
+        self.fail(2)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.fail(1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertTrue(self.breaker.is_open())
+        self.assertEqual(self.breaker.status()["rejected"], 1)
+
+    def test_half_open_probe_closes_on_success(self):
+        self.fail(3)
+        self.now += 10
+        self.assertFalse(self.breaker.is_open())
+        self.assertTrue(self.breaker.allow())
+        # Only one probe at a time
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_half_open_probe_reopens_on_failure(self):
+        self.fail(3)
+        self.now += 10
+        self.fail(1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.status()["retry_in"], 10)
+
+    def test_released_probe_frees_its_slot(self):
+        self.fail(3)
+        self.now += 10
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+
+
+class TimeBudgetTests(SimpleTestCase):
+
+    def test_no_budget(self):
+        self.assertIsNone(remaining_budget())
+
+    def test_budget_runs_out(self):
+        token = start_budget(0.05)
+        try:
+            self.assertLessEqual(remaining_budget(), 0.05)
+            time.sleep(0.06)
+            with self.assertRaises(BudgetExceededError):
+                remaining_budget()
+        finally:
+            end_budget(token)
+        self.assertIsNone(remaining_budget())
+
+    def test_budget_caps_timeouts(self):
+        token = start_budget(0.5)
+        try:
+            connect_timeout, read_timeout = restapis._timeout(5)
+        finally:
+            end_budget(token)
+        self.assertLessEqual(connect_timeout, 0.5)
+        self.assertLessEqual(read_timeout, 0.5)
+
+
+class DownstreamCallTests(SimpleTestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker('backend', failure_threshold=5,
+                                      reset_timeout=30)
+        patcher = mock.patch.dict(restapis.breakers,
+                                  {'backend': self.breaker})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def downstream(self, status=None):
+        downstream = _Downstream(status)
+        self.addCleanup(downstream.close)
+        return downstream
+
+    def test_retries_stay_within_the_budget(self):
+        hanging = self.downstream()
+        token = start_budget(0.5)
+        started = time.monotonic()
+        try:
+            with self.assertRaises(Exception):
+                restapis._call('backend', 'GET', hanging.url)
+        finally:
+            end_budget(token)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertGreaterEqual(self.breaker.failures, 1)
+
+    def test_idempotent_requests_are_retried_on_503(self):
+        downstream = self.downstream(503)
+        response = restapis._call('backend', 'GET', downstream.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(downstream.hits, 1 + restapis.http_max_retries)
+        self.assertEqual(self.breaker.failures, downstream.hits)
+
+    def test_posts_are_sent_once(self):
+        downstream = self.downstream(503)
+        restapis._call('backend', 'POST', downstream.url)
+        self.assertEqual(downstream.hits, 1)
+
+    def test_open_breaker_refuses_calls(self):
+        downstream = self.downstream(200)
+        for _ in range(5):
+            self.breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            restapis._call('backend', 'GET', downstream.url)
+        self.assertEqual(downstream.hits, 0)
+
+    def test_cancelled_probe_does_not_block_the_breaker(self):
+        hanging = self.downstream()
+        for _ in range(5):
+            self.breaker.record_failure()
+        self.breaker.opened_at -= self.breaker.reset_timeout
+
+        async def probe():
+            try:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(restapis._async_call(
+                        'backend', 'GET', hanging.url), 0.2)
+            finally:
+                loop = asyncio.get_running_loop()
+                for client in restapis._async_clients.pop(loop, {}).values():
+                    await client.aclose()
+
+        asyncio.run(probe())
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+
+
+class CursorTests(SimpleTestCase):
+
+    def test_round_trip(self):
+        cursor = encode_cursor(40, 'reviews:15')
+        self.assertEqual(decode_cursor(cursor, 'reviews:15'), 40)
+
+    def test_tampered_cursor_is_rejected(self):
+        cursor = encode_cursor(40, 'reviews:15')
+        forged = signing.dumps({"o": 0, "s": 'reviews:15'}, salt='other',
+                               compress=True)
+        for bad in (cursor[:-1] + ('A' if cursor[-1] != 'A' else 'B'),
+                    forged, 'garbage'):
+            with self.assertRaises(ValueError):
+                decode_cursor(bad, 'reviews:15')
+
+    def test_cursor_of_another_list_is_rejected(self):
+        cursor = encode_cursor(40, 'reviews:15')
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor, 'reviews:16')
+
+    def test_requested_page(self):
+        self.assertIsNone(requested_page({}, 'dealers'))
+        self.assertEqual(requested_page({'limit': '5'}, 'dealers'), (0, 5))
+        cursor = encode_cursor(10, 'dealers')
+        self.assertEqual(requested_page({'cursor': cursor}, 'dealers'),
+                         (10, DEFAULT_PAGE_SIZE))
+        for limit in ('0', 'ten', str(MAX_PAGE_SIZE + 1)):
+            with self.assertRaises(ValueError):
+                requested_page({'limit': limit}, 'dealers')
+
+    def test_page_info(self):
+        info = page_info('dealers', 0, 5, 12)
+        self.assertEqual(info["total"], 12)
+        self.assertEqual(decode_cursor(info["next_cursor"], 'dealers'), 5)
+        # Last page, and an empty page of a list of unknown length
+        self.assertIsNone(page_info('dealers', 10, 2, 12)["next_cursor"])
+        self.assertIsNone(page_info('dealers', 10, 0, None)["next_cursor"])
+        self.assertIsNotNone(page_info('dealers', 10, 5, None)["next_cursor"])
+
+
+def _dealers(count, seed=1):
+    rng = random.Random(seed)
+    # Coordinates are strings, as the backend sends them
+    return [{"id": index + 1,
+             "lat": str(round(rng.uniform(25, 49), 4)),
+             "long": str(round(rng.uniform(-124, -67), 4))}
+            for index in range(count)]
+
+
+def _brute_force(dealers, lat, long):
+    target = unit_vector(lat, long)
+    distances = []
+    for dealer in dealers:
+        point = unit_vector(float(dealer['lat']), float(dealer['long']))
+        distances.append((chord_to_km(math.dist(target, point)),
+                          dealer['id']))
+    return sorted(distances)
+
+
+class DealerIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.dealers = _dealers(300)
+        self.index = DealerIndex()
+        self.index.update(self.dealers)
+
+    def assertMatchesBruteForce(self, results, expected):
+        self.assertEqual([dealer['id'] for _, dealer in results],
+                         [key for _, key in expected])
+        for (km, _), (expected_km, _) in zip(results, expected):
+            self.assertAlmostEqual(km, expected_km, places=6)
+
+    def test_k_nearest(self):
+        rng = random.Random(2)
+        for _ in range(20):
+            lat, long = rng.uniform(20, 50), rng.uniform(-130, -60)
+            self.assertMatchesBruteForce(
+                self.index.nearest(lat, long, k=7),
+                _brute_force(self.dealers, lat, long)[:7])
+
+    def test_radius(self):
+        rng = random.Random(3)
+        for _ in range(20):
+            lat, long = rng.uniform(20, 50), rng.uniform(-130, -60)
+            expected = [(km, key)
+                        for km, key in _brute_force(self.dealers, lat, long)
+                        if km <= 400]
+            self.assertMatchesBruteForce(
+                self.index.nearest(lat, long, k=len(self.dealers),
+                                   radius_km=400),
+                expected)
+
+    def test_distance(self):
+        index = DealerIndex()
+        index.update([{"id": 1, "lat": "0", "long": "0"},
+                      {"id": 2, "lat": "0", "long": "90"}])
+        (km, dealer), = index.nearest(0, 89, k=1)
+        self.assertEqual(dealer["id"], 2)
+        self.assertAlmostEqual(km, 111.195, places=2)
+
+    def test_update_moves_a_dealer_in_place(self):
+        moved = dict(self.dealers[0], lat="0", long="0")
+        renamed = dict(self.dealers[1], full_name="Renamed")
+        dealers = [moved, renamed] + self.dealers[2:-1]
+        self.assertEqual(self.index.update(dealers), (1, 2))
+        self.assertEqual(self.index.builds, 1)
+        self.assertEqual(len(self.index), len(self.dealers) - 1)
+        self.assertMatchesBruteForce(self.index.nearest(0, 0, k=3),
+                                     _brute_force(dealers, 0, 0)[:3])
+        lat, long = float(renamed['lat']), float(renamed['long'])
+        self.assertEqual(self.index.nearest(lat, long, k=1)[0][1],
+                         renamed)
+        # The removed dealer is no longer returned
+        last = self.dealers[-1]
+        self.assertNotEqual(self.index.nearest(
+            float(last['lat']), float(last['long']), k=1)[0][1]['id'],
+            last['id'])
+
+    def test_large_change_rebuilds(self):
+        self.index.update(_dealers(300, seed=4))
+        self.assertEqual(self.index.builds, 2)
+
+    def test_dealers_without_coordinates_are_skipped(self):
+        index = DealerIndex()
+        index.update([{"id": 1, "lat": "", "long": "1"},
+                      {"id": 2, "lat": "95", "long": "1"},
+                      {"id": 3}, {"id": 4, "lat": "1", "long": "1"}])
+        self.assertEqual(len(index), 1)
+
+
+class NearbyQueryTests(SimpleTestCase):
+
+    def test_defaults(self):
+        self.assertEqual(parse_nearby_query({'lat': '40.7', 'long': '-74'}),
+                         {"lat": 40.7, "long": -74.0,
+                          "k": DEFAULT_PAGE_SIZE, "radius_km": None})
+
+    def test_k_and_radius(self):
+        query = parse_nearby_query({'lat': '0', 'long': '0', 'k': '3',
+                                    'radius': '12.5'})
+        self.assertEqual((query["k"], query["radius_km"]), (3, 12.5))
+
+    def test_invalid(self):
+        for params in ({'long': '0'}, {'lat': 'x', 'long': '0'},
+                       {'lat': '91', 'long': '0'},
+                       {'lat': '0', 'long': '-181'},
+                       {'lat': '0', 'long': '0', 'k': '0'},
+                       {'lat': '0', 'long': '0', 'k': 'two'},
+                       {'lat': '0', 'long': '0', 'k': str(MAX_PAGE_SIZE + 1)},
+                       {'lat': '0', 'long': '0', 'radius': '-1'},
+                       {'lat': '0', 'long': '0', 'radius': 'far'}):
+            with self.assertRaises(ValueError, msg=params):
+                parse_nearby_query(params)
+
+
+class CatalogSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Replaces the catalog seeded by the migrations
+        CarModel.objects.all().delete()
+        CarMake.objects.all().delete()
+        makes = {name: CarMake.objects.create(name=name, description=name)
+                 for name in ('Toyota', 'Kia', 'NISSAN')}
+        for name, make, car_type, year in (
+                ("Camry", "Toyota", "SEDAN", 2018),
+                ("Corolla", "Toyota", "SEDAN", 2021),
+                ("Corolla Cross", "Toyota", "SUV", 2023),
+                ("Kluger", "Toyota", "SUV", 2024),
+                ("Carnival", "Kia", "WAGON", 2020),
+                ("Cerato", "Kia", "SEDAN", 2022),
+                ("Qashqai", "NISSAN", "SUV", 2019)):
+            CarModel.objects.create(name=name, car_make=makes[make],
+                                    type=car_type, year=year)
+
+    def search(self, **params):
+        return [car_model["CarModel"] for car_model in
+                search_car_models(parse_catalog_query(params))]
+
+    def test_no_filter_sorts_by_name(self):
+        self.assertEqual(self.search(), [
+            "Camry", "Carnival", "Cerato", "Corolla", "Corolla Cross",
+            "Kluger", "Qashqai"])
+
+    def test_make_is_case_insensitive(self):
+        self.assertEqual(self.search(make="nissan"), ["Qashqai"])
+        self.assertEqual(self.search(make="KIA"), ["Carnival", "Cerato"])
+        self.assertEqual(self.search(make="Ford"), [])
+
+    def test_type_is_case_insensitive(self):
+        self.assertEqual(self.search(type="sedan"),
+                         ["Camry", "Cerato", "Corolla"])
+        self.assertEqual(self.search(type="Wagon"), ["Carnival"])
+
+    def test_year_range(self):
+        self.assertEqual(self.search(min_year="2021", max_year="2023"),
+                         ["Cerato", "Corolla", "Corolla Cross"])
+        self.assertEqual(self.search(max_year="2019"), ["Camry", "Qashqai"])
+
+    def test_name_prefix(self):
+        self.assertEqual(self.search(q="cor"), ["Corolla", "Corolla Cross"])
+        self.assertEqual(self.search(q="C", make="toyota", type="suv"),
+                         ["Corolla Cross"])
+
+    def test_result_fields(self):
+        car_model, = search_car_models(parse_catalog_query({'q': 'kluger'}))
+        self.assertEqual(
+            {key: car_model[key]
+             for key in ("CarModel", "CarMake", "type", "year")},
+            {"CarModel": "Kluger", "CarMake": "Toyota", "type": "SUV",
+             "year": 2024})
+
+    def test_invalid_parameters(self):
+        for params in ({'type': 'coupe'}, {'min_year': 'new'},
+                       {'max_year': '20.5'}):
+            with self.assertRaises(ValueError, msg=params):
+                parse_catalog_query(params)
+
+    def test_endpoint_pages(self):
+        url = reverse('djangoapp:catalog')
+        names = []
+        params = {'make': 'toyota', 'limit': '3'}
+        while True:
+            data = self.client.get(url, params).json()
+            self.assertEqual((data["status"], data["total"]), (200, 4))
+            names += [car_model["CarModel"]
+                      for car_model in data["CarModels"]]
+            if data["next_cursor"] is None:
+                break
+            params["cursor"] = data["next_cursor"]
+        self.assertEqual(names, ["Camry", "Corolla", "Corolla Cross",
+                                 "Kluger"])
+
+    def test_endpoint_rejects_cursor_of_another_search(self):
+        url = reverse('djangoapp:catalog')
+        data = self.client.get(url, {'make': 'toyota', 'limit': '1'}).json()
+        data = self.client.get(url, {'make': 'kia',
+                                     'cursor': data["next_cursor"]}).json()
+        self.assertEqual(data["status"], 400)
+        data = self.client.get(url, {'type': 'coupe'}).json()
+        self.assertEqual(data["status"], 400)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND':
+                'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+               'LOCATION': 'catalog-tests'}})
+class CatalogPayloadTests(TestCase):
+
+    def test_saving_a_model_rebuilds_the_payload(self):
+        body, etag = car_models_payload()
+        self.assertEqual(car_models_payload(), (body, etag))
+        with self.captureOnCommitCallbacks(execute=True):
+            CarModel.objects.create(name="Tests", type="SUV", year=2024,
+                                    car_make=CarMake.objects.first())
+        new_body, new_etag = car_models_payload()
+        self.assertNotEqual(new_etag, etag)
+        self.assertIn(b'"Tests"', new_body)
+
+    def test_generations_never_repeat(self):
+        generations = set()
+        for _ in range(20):
+            invalidate_car_models_payload()
+            generations.add(caches['shared'].get("cars:generation"))
+        self.assertEqual(len(generations), 20)
+
+
+class DealerReviewsPageTests(SimpleTestCase):
+
+    reviews = [{"id": index, "dealership": 15, "review": "Review"}
+               for index in range(1, 6)]
+
+    def setUp(self):
+        self.calls = []
+        for name, function in (
+                ('review_sentiments',
+                 lambda reviews: ["positive"] * len(reviews)),
+                ('get_request', self.backend),
+                ('async_get_request', self.async_backend)):
+            patcher = mock.patch.object(views, name, function)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def backend(self, endpoint, **params):
+        # The paginating "/fetchReviews/dealer/15" of database/app.js
+        self.calls.append(params)
+        if 'limit' not in params:
+            return [dict(review) for review in self.reviews]
+        offset, limit = params['offset'], params['limit']
+        return {"total": len(self.reviews),
+                "reviews": [dict(review) for review in
+                            self.reviews[offset:offset + limit]]}
+
+    async def async_backend(self, endpoint, **params):
+        return self.backend(endpoint, **params)
+
+    def walk(self, view):
+        ids = []
+        params = {'limit': '2'}
+        while True:
+            response = view(RequestFactory().get('/', params), 15)
+            data = loads(response.content)
+            self.assertEqual((data["status"], data["total"]), (200, 5))
+            ids += [review["id"] for review in data["reviews"]]
+            if data["next_cursor"] is None:
+                return ids
+            params["cursor"] = data["next_cursor"]
+
+    def test_pages_are_fetched_from_the_backend(self):
+        self.assertEqual(self.walk(views.get_dealer_reviews),
+                         [1, 2, 3, 4, 5])
+        self.assertEqual(self.calls, [{"offset": 0, "limit": 2},
+                                      {"offset": 2, "limit": 2},
+                                      {"offset": 4, "limit": 2}])
+
+    def test_async_pages(self):
+        self.assertEqual(
+            self.walk(async_to_sync(views.get_dealer_reviews_async)),
+            [1, 2, 3, 4, 5])
+        self.assertEqual(len(self.calls), 3)
+
+    def test_backend_without_pagination(self):
+        # Every review, whatever the parameters; the page is sliced locally
+        with mock.patch.object(views, 'get_request',
+                               lambda endpoint, **params: [
+                                   dict(review) for review in self.reviews]):
+            self.assertEqual(self.walk(views.get_dealer_reviews),
+                             [1, 2, 3, 4, 5])
+
+    def test_unpaginated(self):
+        response = views.get_dealer_reviews(RequestFactory().get('/'), 15)
+        data = loads(response.content)
+        self.assertEqual(len(data["reviews"]), 5)
+        self.assertNotIn("next_cursor", data)
+        self.assertEqual(self.calls, [{}])
+
+
+@override_settings(INVENTORY_SOURCE='local')
+class InventoryPageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        InventoryCar.objects.bulk_create([
+            InventoryCar(source_key=str(price), dealer_id=30, make="Kia",
+                         model="Cerato", body_type="SEDAN", year=2022,
+                         mileage=10000, price=price)
+            for price in range(1000, 7000, 1000)])
+
+    def prices(self, params):
+        # Same request through the sync and the async view
+        request = RequestFactory().get('/', params)
+        responses = [views.get_inventory(request, 30),
+                     async_to_sync(views.get_inventory_async)(request, 30)]
+        pages = []
+        for response in responses:
+            data = loads(response.content)
+            pages.append(([car["price"] for car in data["cars"]],
+                          data.get("next_cursor")))
+        self.assertEqual(pages[0][0], pages[1][0])
+        return pages[0]
+
+    def test_limit_and_offset(self):
+        self.assertEqual(self.prices({'limit': '2', 'offset': '3'})[0],
+                         [4000, 5000])
+
+    def test_cursor_pages_start_at_the_offset(self):
+        params = {'limit': '2', 'offset': '1', 'sort': '-price'}
+        prices, cursor = self.prices(params)
+        self.assertEqual(prices, [5000, 4000])
+        prices, cursor = self.prices(dict(params, cursor=cursor))
+        self.assertEqual(prices, [3000, 2000])
+        prices, cursor = self.prices(dict(params, cursor=cursor))
+        self.assertEqual((prices, cursor), ([1000], None))
+
+
+@override_settings(INVENTORY_SOURCE='local')
+class InventoryStreamTests(TransactionTestCase):
+    # Not TestCase: the stream reads the cars from a thread of its own,
+    # which only sees committed rows
+
+    def test_async_stream(self):
+        InventoryCar.objects.bulk_create([
+            InventoryCar(source_key=str(price), dealer_id=30, make="Kia",
+                         model="Cerato", body_type="SEDAN", year=2022,
+                         mileage=10000, price=price)
+            for price in (3000, 1000, 2000)])
+        request = RequestFactory().get('/', {'stream': 'ndjson',
+                                             'sort': 'price'})
+
+        async def stream():
+            response = await views.get_inventory_async(request, 30)
+            return [loads(line) async for line in response.streaming_content]
+
+        cars = async_to_sync(stream)()
+        self.assertEqual([car["price"] for car in cars], [1000, 2000, 3000])
+
+
+def _car(dealer_id=30, model="Cerato", price=20000, **fields):
+    # A record of carsInventory, without a Mongo _id unless given
+    return dict({"dealer_id": dealer_id, "make": "Kia", "model": model,
+                 "bodyType": "SEDAN", "year": 2022, "mileage": 10000,
+                 "price": price}, **fields)
+
+
+class InventorySyncTests(TestCase):
+
+    def rows(self):
+        return list(InventoryCar.objects.order_by('source_key').values_list(
+            'source_key', 'dealer_id', 'model', 'price'))
+
+    def test_first_sync_creates_every_car(self):
+        counts = sync_inventory_records(
+            [_car(), _car(model="Sorento"), _car(_id="64f0c2")])
+        self.assertEqual(counts, {"created": 3, "updated": 0, "deleted": 0,
+                                  "unchanged": 0})
+        self.assertIn("64f0c2", [row[0] for row in self.rows()])
+
+    def test_identical_cars_are_numbered(self):
+        sync_inventory_records([_car(), _car(), _car()])
+        keys = sorted(key.split(':')[1] for key, *_ in self.rows())
+        self.assertEqual(keys, ['0', '1', '2'])
+
+    def test_resync_without_changes_writes_nothing(self):
+        records = [_car(), _car(), _car(model="Sorento")]
+        sync_inventory_records(records)
+        rows = self.rows()
+        counts = sync_inventory_records(records)
+        self.assertEqual(counts, {"created": 0, "updated": 0, "deleted": 0,
+                                  "unchanged": 3})
+        self.assertEqual(self.rows(), rows)
+
+    def test_price_change_updates_in_place(self):
+        sync_inventory_records([_car(), _car(model="Sorento")])
+        pks = set(InventoryCar.objects.values_list('pk', flat=True))
+        counts = sync_inventory_records([_car(price=18000),
+                                         _car(model="Sorento")])
+        self.assertEqual(counts, {"created": 0, "updated": 1, "deleted": 0,
+                                  "unchanged": 1})
+        self.assertEqual(set(InventoryCar.objects.values_list(
+            'pk', flat=True)), pks)
+        self.assertEqual(InventoryCar.objects.get(model="Cerato").price,
+                         18000)
+
+    def test_removed_cars_are_deleted(self):
+        sync_inventory_records([_car(), _car(), _car(model="Sorento")])
+        counts = sync_inventory_records([_car()])
+        self.assertEqual(counts, {"created": 0, "updated": 0, "deleted": 2,
+                                  "unchanged": 1})
+        self.assertEqual([row[2:] for row in self.rows()],
+                         [("Cerato", 20000)])
+
+    def test_other_dealers_are_kept(self):
+        sync_inventory_records([_car(), _car(dealer_id=31)])
+        counts = sync_inventory_records([], dealer_ids=[30])
+        self.assertEqual(counts["deleted"], 1)
+        self.assertEqual([row[1] for row in self.rows()], [31])
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND':
+                'django.core.cache.backends.locmem.LocMemCache'},
+    'sentiment': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                  'LOCATION': 'sentiment-tests'}})
+class ReviewSentimentTests(TestCase):
+
+    def setUp(self):
+        self.batches = []
+        self.scores = {}
+        self.local = []
+        for name, value in (
+                ('_sentiment_cache', LRUCache(maxsize=100)),
+                ('sentiment_cache_alias', 'sentiment'),
+                ('sentiment_backend', 'remote'),
+                ('analyze_review_sentiments_batch', self.batch),
+                ('classify_sentiment', self.classify)):
+            patcher = mock.patch.object(restapis, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(caches['sentiment'].clear)
+
+    def batch(self, texts, timeout=None):
+        # The sentiment service; texts without a score time out
+        self.batches.append(list(texts))
+        return [self.scores.get(text, restapis.UNKNOWN_SENTIMENT)
+                for text in texts]
+
+    def classify(self, text):
+        self.local.append(text)
+        return "neutral"
+
+    def review(self, review_id, text):
+        return {"id": review_id, "review": text}
+
+    def test_stored_sentiments_are_not_rescored(self):
+        ReviewSentiment.objects.create(
+            review_id=1, text_hash=text_hash("Good"), sentiment="positive")
+        self.assertEqual(review_sentiments([self.review(1, "Good")]),
+                         ["positive"])
+        self.assertEqual(self.batches, [])
+
+    def test_new_reviews_are_scored_once_and_stored(self):
+        self.scores = {"Good": "positive", "Bad": "negative"}
+        reviews = [self.review(1, "Good"), self.review(2, "Bad"),
+                   self.review(3, "Good")]
+        self.assertEqual(review_sentiments(reviews),
+                         ["positive", "negative", "positive"])
+        # Distinct texts only
+        self.assertEqual(self.batches, [["Good", "Bad"]])
+        self.assertEqual(ReviewSentiment.objects.count(), 3)
+        self.assertEqual(review_sentiments(reviews),
+                         ["positive", "negative", "positive"])
+        self.assertEqual(len(self.batches), 1)
+
+    def test_reused_review_id_is_rescored(self):
+        ReviewSentiment.objects.create(
+            review_id=1, text_hash=text_hash("Good"), sentiment="positive")
+        self.scores = {"Awful": "negative"}
+        self.assertEqual(review_sentiments([self.review(1, "Awful")]),
+                         ["negative"])
+        row = ReviewSentiment.objects.get(review_id=1)
+        self.assertEqual((row.text_hash, row.sentiment),
+                         (text_hash("Awful"), "negative"))
+
+    def test_cache_hits_skip_the_service(self):
+        self.scores = {"Good": "positive"}
+        review_sentiments([self.review(1, "Good")])
+        # Another review with the same text, modulo whitespace
+        self.assertEqual(review_sentiments([self.review(2, " Good ")]),
+                         ["positive"])
+        self.assertEqual(len(self.batches), 1)
+        stats = restapis.sentiment_cache_stats()
+        self.assertGreaterEqual(stats["hits"], 1)
+
+    def test_persistent_cache_survives_a_restart(self):
+        self.scores = {"Good": "positive"}
+        review_sentiments([self.review(1, "Good")])
+        restapis._sentiment_cache = LRUCache(maxsize=100)
+        self.assertEqual(review_sentiments([self.review(2, "Good")]),
+                         ["positive"])
+        self.assertEqual(len(self.batches), 1)
+
+    def test_unknown_sentiments_are_retried(self):
+        reviews = [self.review(1, "Slow")]
+        self.assertEqual(review_sentiments(reviews),
+                         [restapis.UNKNOWN_SENTIMENT])
+        self.assertFalse(ReviewSentiment.objects.exists())
+        self.scores = {"Slow": "neutral"}
+        self.assertEqual(review_sentiments(reviews), ["neutral"])
+        self.assertEqual(len(self.batches), 2)
+
+    def test_remote_backend_does_not_score_locally(self):
+        review_sentiments([self.review(1, "Slow")])
+        self.assertEqual(self.local, [])
+
+    def test_auto_backend_scores_what_the_service_did_not(self):
+        restapis.sentiment_backend = 'auto'
+        self.scores = {"Good": "positive"}
+        self.assertEqual(review_sentiments([self.review(1, "Good"),
+                                            self.review(2, "Slow")]),
+                         ["positive", "neutral"])
+        self.assertEqual(self.local, ["Slow"])
+
+    def test_local_backend_skips_the_service(self):
+        restapis.sentiment_backend = 'local'
+        self.assertEqual(review_sentiments([self.review(1, "Good")]),
+                         ["neutral"])
+        self.assertEqual(self.batches, [])
+
+    def test_service_without_batch_endpoint(self):
+        with mock.patch.object(restapis, 'analyze_review_sentiments_batch',
+                               lambda texts, timeout=None: None), \
+                mock.patch.object(restapis, 'analyze_reviews_sentiments',
+                                  lambda texts: ["positive"] * len(texts)):
+            self.assertEqual(review_sentiments([self.review(1, "Good")]),
+                             ["positive"])
@@ -20,21 +20,42 @@ from django.conf.urls.static import static
 from django.conf import settings
 from . import views
 
+# Views that call downstream services have async variants for ASGI serving
+if settings.ASYNC_VIEWS:
+    get_dealerships = views.get_dealerships_async
+    get_dealers_near = views.get_dealers_near_async
+    get_dealer_details = views.get_dealer_details_async
+    get_dealer_reviews = views.get_dealer_reviews_async
+    get_inventory = views.get_inventory_async
+else:
+    get_dealerships = views.get_dealerships
+    get_dealers_near = views.get_dealers_near
+    get_dealer_details = views.get_dealer_details
+    get_dealer_reviews = views.get_dealer_reviews
+    get_inventory = views.get_inventory
+
 app_name = 'djangoapp'
 urlpatterns = [
     path(route='register', view=views.registration, name='register'),
     path(route='login', view=views.login_user, name='login'),
     path(route='logout', view=views.logout_request, name='logout'),
     path(route='get_cars', view=views.get_cars, name='getcars'),
-    path(route='get_dealers/', view=views.get_dealerships, name='get_dealers'),
-    path(route='get_dealers/<str:state>', view=views.get_dealerships,
+    path(route='catalog', view=views.get_catalog, name='catalog'),
+    path(route='get_dealers/', view=get_dealerships, name='get_dealers'),
+    path(route='dealers/near', view=get_dealers_near,
+         name='get_dealers_near'),
+    path(route='get_dealers/<str:state>', view=get_dealerships,
          name='get_dealers_by_state'),
-    path(route='dealer/<int:dealer_id>', view=views.get_dealer_details,
+    path(route='dealer/<int:dealer_id>', view=get_dealer_details,
          name='get_dealer_details'),
-    path(route='reviews/dealer/<int:dealer_id>', view=views.get_dealer_reviews,
+    path(route='reviews/dealer/<int:dealer_id>', view=get_dealer_reviews,
          name='dealer_details'),
     path(route='add_review', view=views.add_review,
          name='add_review'),
-    path(route='get_inventory/<int:dealer_id>', view=views.get_inventory,
+    path(route='get_inventory/<int:dealer_id>', view=get_inventory,
          name='get_inventory'),
+    path(route='dealer_page/<int:dealer_id>', view=views.get_dealer_page,
+         name='dealer_page'),
+    path(route='downstreams', view=views.get_downstream_status,
+         name='downstreams'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -41,81 +41,214 @@ from django.contrib.auth import logout
 # from django.contrib import messages
 # from datetime import datetime
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
 from django.contrib.auth import login, authenticate
+import asyncio
 import logging
-import json
+from asgiref.sync import sync_to_async
 from django.views.decorators.csrf import csrf_exempt
-from .populate import initiate
-
-from .models import CarMake, CarModel
-from .restapis import get_request, analyze_review_sentiments, post_review, searchcars_request
+from .catalog import (car_models_payload, parse_catalog_query,
+                      search_car_models)
+from .metrics import render_metrics
+
+from .jsoncodec import JSONDecodeError, JsonResponse, loads
+from .geo import parse_nearby_query
+from .inventory import (parse_inventory_query, query_local_inventory,
+                        iter_local_inventory, summarize_inventory,
+                        summarize_local_inventory)
+from .restapis import (get_request, get_dealers, post_review,
+                       search_inventory, iter_inventory, async_get_request,
+                       async_get_dealers,
+                       async_search_inventory, downstream_status,
+                       sentiment_cache_stats, nearest_dealers,
+                       async_nearest_dealers)
+from .pagination import DEFAULT_PAGE_SIZE, page_info, requested_page
+from .reviews import review_sentiments, store_review_sentiment
+from .streaming import ndjson_response, wants_ndjson
 
 # Get an instance of a logger
 logger = logging.getLogger(__name__)
+# Request bodies, only written at DEBUG (see log.py)
+payload_logger = logging.getLogger('djangoapp.payloads')
+
+# Reviews scored per sentiment request when streaming
+REVIEW_CHUNK_SIZE = 20
 
 
 # View functions
 def get_inventory(request, dealer_id):
-    data = request.GET
+    """ Searches the inventory of a dealer and returns the matching cars as
+        a JSON response.
+
+        Any subset of filters can be combined (make, model, body type,
+        year/mileage/price ranges), with sorting and limit/offset; see
+        `parse_inventory_query`. The search is answered by one downstream
+        query, or by the local inventory store when settings.INVENTORY_SOURCE
+        is "local". Pages can also be walked with `limit` and the opaque
+        `cursor` returned as "next_cursor" (see pagination.py), starting at
+        `offset`; the page is fetched with the downstream query itself.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request object, with the
+                filters as query parameters.
+            dealer_id (int): The ID of the dealer whose inventory to search.
+
+        Returns:
+            JsonResponse: A JSON response containing:
+                - "status": 200 for success, 400 for a bad request.
+                - "cars" (list, if status is 200): The matching cars.
+                - "total" (int, if status is 200): The number of matching
+                  cars before limit/offset.
+                - "next_cursor" (str, if paginated): The cursor of the next
+                  page, or None on the last page.
+                - "message" (str, if status is 400): An error message.
+            StreamingHttpResponse: With `stream=ndjson` (see streaming.py),
+                the matching cars, one JSON object per line.
+    """
     if (dealer_id):
-        if 'year' in data:
-            endpoint = "/carsbyyear/"+str(dealer_id)+"/"+data['year']
-        elif 'make' in data:
-            endpoint = "/carsbymake/"+str(dealer_id)+"/"+data['make']
-        elif 'model' in data:
-            endpoint = "/carsbymodel/"+str(dealer_id)+"/"+data['model']
-        elif 'mileage' in data:
-            endpoint = "/carsbymaxmileage/"+str(dealer_id)+"/"+data['mileage']
-        elif 'price' in data:
-            endpoint = "/carsbyprice/"+str(dealer_id)+"/"+data['price']
+        try:
+            query = parse_inventory_query(request.GET)
+            scope = _inventory_scope(dealer_id, query)
+            page = _inventory_page(request.GET, query, scope)
+        except ValueError as e:
+            return JsonResponse({"status": 400, "message": str(e)})
+        if page:
+            query['offset'], query['limit'] = page
+        if wants_ndjson(request):
+            return ndjson_response(_inventory_records(dealer_id, query))
+        if settings.INVENTORY_SOURCE == 'local':
+            result = query_local_inventory(dealer_id, query)
         else:
-            endpoint = "/cars/"+str(dealer_id)
- 
-        cars = searchcars_request(endpoint)
-        return JsonResponse({"status": 200, "cars": cars})
+            result = search_inventory(dealer_id, query) or {}
+        return JsonResponse(_inventory_response(result, scope, page))
     else:
         return JsonResponse({"status": 400, "message": "Bad Request"})
-    return JsonResponse({"status": 400, "message": "Bad Request"})
+
+
+def _inventory_scope(dealer_id, query):
+    """ Identifies an inventory search for its pagination cursors. """
+    filters = sorted((name, value) for name, value in query.items()
+                     if name not in ('limit', 'offset'))
+    return "inventory:{}:{}".format(dealer_id, filters)
+
+
+def _inventory_page(params, query, scope):
+    """ Reads the page an inventory request asks for (see
+        `requested_page`). The first page starts at the query's `offset`;
+        the cursors of the next ones carry their own.
+    """
+    page = requested_page(params, scope)
+    if page and not params.get('cursor'):
+        page = (query.get('offset', 0), page[1])
+    return page
+
+
+def _inventory_response(result, scope, page):
+    data = {"status": 200,
+            "cars": result.get('cars'),
+            "total": result.get('total')}
+    if page:
+        data.update(page_info(scope, page[0], len(data['cars'] or []),
+                              data['total']))
+    return data
+
+
+def _paginate(request, scope, items):
+    """ Slices a fully fetched list to the page the request asks for.
+
+        Returns:
+            tuple: (items, fields) where fields holds the pagination fields
+                of the response, empty if the request is not paginated.
+
+        Raises:
+            ValueError: If `limit` or `cursor` is invalid.
+    """
+    page = requested_page(request.GET, scope)
+    if page is None:
+        return items, {}
+    offset, limit = page
+    total = len(items)
+    items = items[offset:offset + limit]
+    return items, page_info(scope, offset, len(items), total)
+
+
+def _inventory_records(dealer_id, query):
+    """ Returns a lazy iterator over the cars matching an inventory query. """
+    if settings.INVENTORY_SOURCE == 'local':
+        return iter_local_inventory(dealer_id, query)
+    return iter_inventory(dealer_id, query)
 
 
 def get_cars(request):
     """ Retrieves a list of car models along with their makes and returns it
         as a JSON response.
 
-        Checks if any car makes exist in the database. If not, it initiates the
-        process of populating the car make and model data
-        (using the `initiate()` function).
-        Then, it fetches all car models, selecting the related car make for
-        each model, and formats the data into a list of dictionaries containing
-        the car model name and its corresponding car make name.
+        The car catalog is seeded outside the request path (by the
+        `0002_seed_catalog` migration or the `seed_catalog` command).
+        The serialized list of car models is built once and cached (see
+        catalog.py) until a CarMake or CarModel changes. The response carries
+        a strong ETag, and a request whose If-None-Match matches it gets
+        304 Not Modified.
 
         Args:
             request (HttpRequest): The incoming HTTP request object.
 
         Returns:
-            JsonResponse: A JSON response containing a dictionary with the key
+            HttpResponse: A JSON response containing a dictionary with the key
                 "CarModels". The value associated with this key is a list of
                 dictionaries, where each dictionary represents a car model and
                 its make, with the keys "CarModel" and "CarMake".
     """
-    count = CarMake.objects.filter().count()
-    print(count)
-    if (count == 0):
-        initiate()
-    car_models = CarModel.objects.select_related('car_make')
-    cars = []
-    for car_model in car_models:
-        cars.append({"CarModel": car_model.name,
-                     "CarMake": car_model.car_make.name})
-    return JsonResponse({"CarModels": cars})
+    body, etag = car_models_payload()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type="application/json")
+    response['ETag'] = etag
+    return response
+
+
+def get_catalog(request):
+    """ Searches the car catalog and returns one page of matching models.
+
+        Query parameters (see `catalog.parse_catalog_query`): `make`, `type`,
+        `min_year`, `max_year` and `q` (model name prefix), plus `limit` and
+        `cursor` (see pagination.py). Pages hold DEFAULT_PAGE_SIZE models
+        unless `limit` says otherwise.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request object.
+
+        Returns:
+            JsonResponse: A JSON response containing:
+                - "status": 200, or 400 for malformed parameters.
+                - "CarModels" (list, if status is 200): The page of models,
+                  each with "id", "CarModel", "CarMake", "type" and "year",
+                  sorted by model name.
+                - "total", "next_cursor": The page fields.
+                - "message" (str, if status is 400): An error message.
+    """
+    try:
+        query = parse_catalog_query(request.GET)
+        scope = "catalog:{}".format(sorted(query.items()))
+        offset, limit = (requested_page(request.GET, scope)
+                         or (0, DEFAULT_PAGE_SIZE))
+    except ValueError as e:
+        return JsonResponse({"status": 400, "message": str(e)})
+    car_models = search_car_models(query)
+    page = list(car_models[offset:offset + limit])
+    return JsonResponse({"status": 200, "CarModels": page,
+                         **page_info(scope, offset, len(page),
+                                     car_models.count())})
 
 
 # Create a `login_request` view to handle sign in request
 @csrf_exempt
 def login_user(request):
     # Get username and password from request.POST dictionary
-    data = json.loads(request.body)
+    data = loads(request.body)
     username = data['userName']
     password = data['password']
     # Try to check if provide credential can be authenticated
@@ -140,49 +273,42 @@ def logout_request(request):
 def registration(request):
     # context = {}
     # load & extract request data to use in below logic
-    data = json.loads(request.body)
+    data = loads(request.body)
     username = data['userName']
     password = data['password']
     first_name = data['firstName']
     last_name = data['lastName']
     email = data['email']
-    username_exist = False
-    # email_exist = False
 
     try:
-        # Check if user already exists with username
-        User.objects.get(username=username)
-        username_exist = True
-    except Exception as e:
-        # If not, log 'this as a new user'
-        logger.debug(f"Error checking for existing user: {e}")
-        logger.debug("{} is new user".format(username))
-
-    # If it is a new user
-    if not username_exist:
-        # Create user in auth_user table
-        user = User.objects.create_user(username=username,
-                                        first_name=first_name,
-                                        last_name=last_name,
-                                        password=password,
-                                        email=email)
-        # Login the user and redirect to list page
-        login(request, user)
-        data = {"userName": username, "status": "Authenticated"}
-        return JsonResponse(data)
-    else:
+        # Create user in auth_user table; one INSERT, which the unique
+        # username constraint rejects if the user already exists
+        with transaction.atomic():
+            user = User.objects.create_user(username=username,
+                                            first_name=first_name,
+                                            last_name=last_name,
+                                            password=password,
+                                            email=email)
+    except IntegrityError:
+        logger.debug("{} is already registered".format(username))
         data = {"userName": username, "error": "Already Registered"}
         return JsonResponse(data)
 
+    # Login the user and redirect to list page
+    login(request, user)
+    data = {"userName": username, "status": "Authenticated"}
+    return JsonResponse(data)
+
 
 def get_dealerships(request, state="All"):
     """ Fetches and returns a list of dealerships as a JSON response,
         optionally filtered by state.
 
         This view function retrieves dealership data from an external API using
-        the`get_request` function. If the 'state' parameter is provided in the
-        request's GET parameters, it fetches dealerships for that specific
-        state. Otherwise, it fetches all dealerships.
+        the `get_dealers` function, which serves it from the dealer cache when
+        possible. If the 'state' parameter is provided in the request's GET
+        parameters, it fetches dealerships for that specific state.
+        Otherwise, it fetches all dealerships.
 
         Args:
             request (HttpRequest): The incoming HTTP request object. The
@@ -194,13 +320,52 @@ def get_dealerships(request, state="All"):
                 - "status": 200, indicating a successful request.
                 - "dealers": A list of dealership objects (dictionaries)
                    retrieved from the external API.
+                - "total", "next_cursor": With `limit`/`cursor`, the page
+                   fields (see pagination.py); the cached list is sliced.
     """
-    if (state == "All"):
-        endpoint = "/fetchDealers/"
-    else:
-        endpoint = "/fetchDealers/"+state
-    dealerships = get_request(endpoint)
-    return JsonResponse({"status": 200, "dealers": dealerships})
+    dealerships = get_dealers(state)
+    try:
+        dealerships, page = _paginate(request, "dealers:" + state,
+                                      dealerships or [])
+    except ValueError as e:
+        return JsonResponse({"status": 400, "message": str(e)})
+    return JsonResponse({"status": 200, "dealers": dealerships, **page})
+
+
+def _nearby_response(results):
+    if results is None:
+        return {"status": 503, "message": "Dealers are unavailable"}
+    dealers = [dict(dealer, distance_km=round(distance, 3))
+               for distance, dealer in results]
+    return {"status": 200, "dealers": dealers}
+
+
+def get_dealers_near(request):
+    """ Returns the dealerships nearest to a location, nearest first.
+
+        Served from an in-memory spatial index of the dealer listing (see
+        geo.py), so the client does not fetch every dealer to compute
+        distances itself.
+
+        Query parameters (see `geo.parse_nearby_query`): `lat` and `long`
+        (required), `k` (the most dealers to return) and `radius` (in km).
+
+        Args:
+            request (HttpRequest): The incoming HTTP request object.
+
+        Returns:
+            JsonResponse: A JSON response containing:
+                - "status": 200, 400 for malformed parameters, or 503 if the
+                  dealers could not be fetched.
+                - "dealers" (list, if status is 200): The dealership
+                  objects, each with an added "distance_km".
+                - "message" (str, otherwise): An error message.
+    """
+    try:
+        query = parse_nearby_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({"status": 400, "message": str(e)})
+    return JsonResponse(_nearby_response(nearest_dealers(**query)))
 
 
 def get_dealer_reviews(request, dealer_id):
@@ -209,7 +374,12 @@ def get_dealer_reviews(request, dealer_id):
 
         Retrieves reviews for the given dealer ID from an external API,
         analyzes the sentiment of each review, and includes the sentiment in
-        the response.
+        the response. Sentiments stored when the reviews were submitted are
+        joined from the ReviewSentiment table; the other reviews are scored
+        (sentiment cache, then one batch request, or concurrent requests if
+        that fails) and stored. A review whose sentiment is not
+        available before the deadline is reported as "unknown". Reviews keep
+        the order returned by the backend.
 
         Args:
             request (HttpRequest): The incoming HTTP request object.
@@ -223,8 +393,14 @@ def get_dealer_reviews(request, dealer_id):
                           dictionaries. Each dictionary contains the original
                           review details along with an added "sentiment" key
                           indicating the analyzed sentiment.
+                - "total", "next_cursor": With `limit`/`cursor`, the page
+                          fields (see pagination.py). Only the reviews of the
+                          page are fetched from the backend and scored.
                 - "message" (str, if status is 400): An error message
                           indicating a bad request.
+            StreamingHttpResponse: With `stream=ndjson` (see streaming.py),
+                the reviews with their sentiment, one JSON object per line,
+                sent as each chunk of reviews is scored.
     """
     if dealer_id:
         try:
@@ -233,23 +409,89 @@ def get_dealer_reviews(request, dealer_id):
             # dealer = get_object_or_404(Dealer, pk=dealer_id)
 
             endpoint = "/fetchReviews/dealer/" + str(dealer_id)
-            reviews = get_request(endpoint)
+            scope, page, params = _reviews_request(request, dealer_id)
+            # Only the reviews of the requested page are fetched and scored
+            reviews, page = _reviews_page(get_request(endpoint, **params),
+                                          scope, page)
+            if wants_ndjson(request):
+                return ndjson_response(_scored_reviews(reviews))
             if reviews:
-                for review_detail in reviews:
-                    response = analyze_review_sentiments(review_detail['review'])
-                    print(response)
-                    review_detail['sentiment'] = response.get('sentiment')  # Use .get() to avoid KeyError
-                return JsonResponse({"status": 200, "reviews": reviews})
+                # Stored sentiments are joined; only new reviews are scored
+                sentiments = review_sentiments(reviews)
+                for review_detail, sentiment in zip(reviews, sentiments):
+                    review_detail['sentiment'] = sentiment
+                return JsonResponse({"status": 200, "reviews": reviews,
+                                     **page})
             else:
-                return JsonResponse({"status": 200, "reviews": []})  # No reviews found, but valid request
-        except ValueError:
-            return JsonResponse({"status": 400, "message": "Invalid dealer_id format."})
-        # except Dealer.DoesNotExist:  # If you uncomment the get_object_or_404
-        #     return JsonResponse({"status": 400, "message": f"Dealer with ID {dealer_id} not found."})
+                # No reviews found, but valid request
+                return JsonResponse({"status": 200, "reviews": [], **page})
+        except ValueError as e:
+            return JsonResponse({"status": 400,
+                                 "message": f"Invalid dealer_id format or "
+                                            f"page: {e}"})
+        # If you uncomment the get_object_or_404:
+        # except Dealer.DoesNotExist:
+        #     return JsonResponse({"status": 400, "message":
+        #                          f"Dealer with ID {dealer_id} not found."})
         except Exception as e:
-            return JsonResponse({"status": 500, "message": f"Error fetching or processing reviews: {e}"})
+            return JsonResponse({"status": 500,
+                                 "message": f"Error fetching or processing "
+                                            f"reviews: {e}"})
+    else:
+        return JsonResponse({"status": 400,
+                             "message": "dealer_id parameter is missing."})
+
+
+def _reviews_request(request, dealer_id):
+    """ Reads the page of a dealer's reviews a request asks for.
+
+        Returns:
+            tuple: (scope, page, params) where page is as in `requested_page`
+                and params are the backend's query parameters for it.
+
+        Raises:
+            ValueError: If `limit` or `cursor` is invalid.
+    """
+    scope = "reviews:" + str(dealer_id)
+    page = requested_page(request.GET, scope)
+    params = {} if page is None else {"offset": page[0], "limit": page[1]}
+    return scope, page, params
+
+
+def _reviews_page(result, scope, page):
+    """ Reads the reviews out of a "/fetchReviews/dealer" response.
+
+        A paginated request gets {"total", "reviews"} from the backend, with
+        only the reviews of the page; a backend that does not paginate
+        returns every review, and the page is sliced here.
+
+        Returns:
+            tuple: (reviews, fields) where fields holds the pagination fields
+                of the response, empty if the request is not paginated.
+    """
+    if page is None:
+        return result or [], {}
+    offset, limit = page
+    if isinstance(result, dict):
+        if 'reviews' not in result:
+            # The backend's error body
+            raise ConnectionError("reviews are unavailable")
+        reviews = result['reviews']
+        total = result.get('total')
     else:
-        return JsonResponse({"status": 400, "message": "dealer_id parameter is missing."})
+        reviews = (result or [])[offset:offset + limit]
+        total = len(result or [])
+    return reviews, page_info(scope, offset, len(reviews), total)
+
+
+def _scored_reviews(reviews, chunk_size=REVIEW_CHUNK_SIZE):
+    """ Yields reviews with their sentiment, scoring them chunk by chunk. """
+    for start in range(0, len(reviews), chunk_size):
+        chunk = reviews[start:start + chunk_size]
+        sentiments = review_sentiments(chunk)
+        for review_detail, sentiment in zip(chunk, sentiments):
+            review_detail['sentiment'] = sentiment
+            yield review_detail
 
 
 def get_dealer_details(request, dealer_id):
@@ -306,7 +548,7 @@ def _add_review(request):
                 will also include "message": "Unauthorized".
     """
     if request.user.is_anonymous is False:
-        data = json.loads(request.body)
+        data = loads(request.body)
         try:
             response = post_review(data)
             return JsonResponse({"status": 200, "data": response})
@@ -318,31 +560,253 @@ def _add_review(request):
                              "message": "Unauthorized"})
 
 
-# DEBUG
 def add_review(request):
     """Handles the submission of a new dealership review from an authenticated
        user.
 
     ... (rest of your docstring) ...
     """
-    print("DEBUG: add_review view called")  # Debug
     if not request.user.is_anonymous:  # Changed to use not
-        print("DEBUG: User is authenticated")
+        logger.debug("add_review called",
+                     extra={"user": request.user.username})
         try:
-            data = json.loads(request.body)
-            print(f"DEBUG: Received JSON data: {data}")  # Debug
+            data = loads(request.body)
+            payload_logger.debug("Review received", extra={"payload": data})
             response = post_review(data)
-            print(f"DEBUG: Response from post_review: {response}")  # Debug
+            if response and response.get('id') is not None:
+                # Score once at write time; reads join the stored sentiment
+                try:
+                    store_review_sentiment(response)
+                except Exception as e:
+                    logger.warning("Review sentiment not stored",
+                                   extra={"review_id": response.get('id'),
+                                          "error": str(e)})
             return JsonResponse({"status": 200})
-        except json.JSONDecodeError as e:
-            print(f"DEBUG: JSONDecodeError: {e}")
+        except JSONDecodeError as e:
+            logger.info("Invalid review JSON", extra={"error": str(e)})
             return JsonResponse({"status": 400,
                                  "message": "Invalid JSON"})
         except Exception as e:
-            print(f"DEBUG: Exception in add_review: {e}")  # Debug
+            logger.warning("Review not posted", extra={"error": str(e)})
             return JsonResponse({"status": 401,
                                  "message": "Error in posting review"})
     else:
-        print("DEBUG: User is not authenticated")  # Debug
+        logger.debug("add_review called anonymously")
         return JsonResponse({"status": 403,
                              "message": "Unauthorized"})
+
+
+# Async views
+#
+# Served instead of their synchronous counterparts when settings.ASYNC_VIEWS
+# is on (SERVER_MODE=asgi). While a downstream call is in flight the worker
+# keeps serving other requests instead of blocking.
+async def get_inventory_async(request, dealer_id):
+    """ Async variant of `get_inventory`. """
+    if (dealer_id):
+        try:
+            query = parse_inventory_query(request.GET)
+            scope = _inventory_scope(dealer_id, query)
+            page = _inventory_page(request.GET, query, scope)
+        except ValueError as e:
+            return JsonResponse({"status": 400, "message": str(e)})
+        if page:
+            query['offset'], query['limit'] = page
+        if wants_ndjson(request):
+            return ndjson_response(_inventory_records(dealer_id, query),
+                                   asynchronous=True)
+        if settings.INVENTORY_SOURCE == 'local':
+            result = await sync_to_async(query_local_inventory)(dealer_id,
+                                                                query)
+        else:
+            result = await async_search_inventory(dealer_id, query) or {}
+        return JsonResponse(_inventory_response(result, scope, page))
+    else:
+        return JsonResponse({"status": 400, "message": "Bad Request"})
+
+
+async def get_dealerships_async(request, state="All"):
+    """ Async variant of `get_dealerships`. """
+    dealerships = await async_get_dealers(state)
+    try:
+        dealerships, page = _paginate(request, "dealers:" + state,
+                                      dealerships or [])
+    except ValueError as e:
+        return JsonResponse({"status": 400, "message": str(e)})
+    return JsonResponse({"status": 200, "dealers": dealerships, **page})
+
+
+async def get_dealers_near_async(request):
+    """ Async variant of `get_dealers_near`. """
+    try:
+        query = parse_nearby_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({"status": 400, "message": str(e)})
+    return JsonResponse(_nearby_response(
+        await async_nearest_dealers(**query)))
+
+
+async def get_dealer_details_async(request, dealer_id):
+    """ Async variant of `get_dealer_details`. """
+    if (dealer_id):
+        endpoint = "/fetchDealer/"+str(dealer_id)
+        dealership = await async_get_request(endpoint)
+        return JsonResponse({"status": 200, "dealer": dealership})
+    else:
+        return JsonResponse({"status": 400, "message": "Bad Request"})
+
+
+async def get_dealer_reviews_async(request, dealer_id):
+    """ Async variant of `get_dealer_reviews`.
+
+        Sentiment lookup and scoring (the ReviewSentiment table, the cache
+        and the calls to the sentiment service) runs in a worker thread.
+    """
+    if not dealer_id:
+        return JsonResponse({"status": 400,
+                             "message": "dealer_id parameter is missing."})
+    try:
+        endpoint = "/fetchReviews/dealer/" + str(int(dealer_id))
+        scope, page, params = _reviews_request(request, int(dealer_id))
+        reviews, page = _reviews_page(
+            await async_get_request(endpoint, **params), scope, page)
+        if wants_ndjson(request):
+            return ndjson_response(_scored_reviews(reviews),
+                                   asynchronous=True)
+        if not reviews:
+            return JsonResponse({"status": 200, "reviews": [], **page})
+        sentiments = await _async_review_sentiments(reviews)
+        for review_detail, sentiment in zip(reviews, sentiments):
+            review_detail['sentiment'] = sentiment
+        return JsonResponse({"status": 200, "reviews": reviews, **page})
+    except ValueError as e:
+        return JsonResponse({"status": 400,
+                             "message": f"Invalid dealer_id format or "
+                                        f"page: {e}"})
+    except Exception as e:
+        return JsonResponse({"status": 500,
+                             "message": f"Error fetching or processing "
+                                        f"reviews: {e}"})
+
+
+async def _async_review_sentiments(reviews):
+    # Scored in a worker thread rather than Django's shared sync thread, so
+    # the sentiment calls of concurrent requests do not wait on each other
+    return await sync_to_async(_threaded_review_sentiments,
+                               thread_sensitive=False)(reviews)
+
+
+def _threaded_review_sentiments(reviews):
+    # Database connections opened by the worker thread are recycled as the
+    # request cycle would (CONN_MAX_AGE), outside of any request
+    try:
+        return review_sentiments(reviews)
+    finally:
+        close_old_connections()
+
+
+async def _dealer_page_request(endpoint):
+    # Under WSGI every request runs on an event loop of its own, so async
+    # clients (bound to their loop) would be created per request and never
+    # reused; the pooled sessions are used from worker threads instead.
+    if settings.ASYNC_VIEWS:
+        return await async_get_request(endpoint)
+    return await sync_to_async(get_request, thread_sensitive=False)(endpoint)
+
+
+async def _dealer_page_reviews(dealer_id):
+    reviews = await _dealer_page_request(
+        "/fetchReviews/dealer/" + str(dealer_id))
+    if reviews is None:
+        raise ConnectionError("reviews are unavailable")
+    sentiments = await _async_review_sentiments(reviews)
+    for review_detail, sentiment in zip(reviews, sentiments):
+        review_detail['sentiment'] = sentiment
+    return reviews
+
+
+async def _dealer_page_inventory(dealer_id):
+    if settings.INVENTORY_SOURCE == 'local':
+        return await sync_to_async(summarize_local_inventory)(dealer_id)
+    if settings.ASYNC_VIEWS:
+        result = await async_search_inventory(dealer_id, {})
+    else:
+        result = await sync_to_async(search_inventory,
+                                     thread_sensitive=False)(dealer_id, {})
+    if result is None:
+        raise ConnectionError("inventory is unavailable")
+    return summarize_inventory(result['cars'])
+
+
+async def _dealer_page_details(dealer_id):
+    dealer = await _dealer_page_request("/fetchDealer/" + str(dealer_id))
+    if dealer is None:
+        raise ConnectionError("dealer details are unavailable")
+    return dealer
+
+
+async def get_dealer_page(request, dealer_id):
+    """ Returns everything the dealer page shows in one JSON response.
+
+        Dealer details, reviews with their sentiment and an inventory
+        summary are fetched concurrently, so the response takes about as
+        long as the slowest of them. A part that fails or does not arrive
+        within settings.DEALER_PAGE_TIMEOUT is returned as null and named in
+        "errors"; the other parts are still returned.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request object.
+            dealer_id (int): The ID of the dealer.
+
+        Returns:
+            JsonResponse: A JSON response containing:
+                - "status": 200.
+                - "dealer": As in `get_dealer_details`.
+                - "reviews": As in `get_dealer_reviews`.
+                - "inventory": "total" cars, distinct "makes", and "year"
+                  and "price" ranges (see `summarize_inventory`).
+                - "errors": The error message of each failed part, by name.
+    """
+    parts = {"dealer": _dealer_page_details(dealer_id),
+             "reviews": _dealer_page_reviews(dealer_id),
+             "inventory": _dealer_page_inventory(dealer_id)}
+    results = await asyncio.gather(
+        *(asyncio.wait_for(part, settings.DEALER_PAGE_TIMEOUT)
+          for part in parts.values()),
+        return_exceptions=True)
+
+    data = {"status": 200, "errors": {}}
+    for name, result in zip(parts, results):
+        if isinstance(result, asyncio.TimeoutError):
+            data[name] = None
+            data["errors"][name] = "timed out"
+        elif isinstance(result, Exception):
+            data[name] = None
+            data["errors"][name] = str(result)
+        else:
+            data[name] = result
+    return JsonResponse(data)
+
+
+def get_downstream_status(request):
+    """ Reports the health of the downstream services as seen by this
+        worker, for monitoring.
+
+        Returns:
+            JsonResponse: A JSON response containing:
+                - "status": 200.
+                - "downstreams": The circuit breaker of each downstream
+                  service (see `restapis.downstream_status`).
+                - "sentiment_cache": Sentiment cache counters.
+    """
+    return JsonResponse({"status": 200,
+                         "downstreams": downstream_status(),
+                         "sentiment_cache": sentiment_cache_stats()})
+
+
+def get_metrics(request):
+    """ Exposes the request and downstream latency histograms of all workers
+        in the Prometheus text format (see metrics.py).
+    """
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
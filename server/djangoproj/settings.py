@@ -52,22 +52,25 @@ REST_FRAMEWORK = {
 # Application definition
 
 INSTALLED_APPS = [
-    'djangoapp.apps.DjangoappConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    # After django.contrib.auth, whose signal receivers it may adjust
+    'djangoapp.apps.DjangoappConfig',
 ]
 
 MIDDLEWARE = [
+    'djangoapp.middleware.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'djangoapp.middleware.downstream_budget_middleware',
 ]
 
 ROOT_URLCONF = 'djangoproj.urls'
@@ -93,16 +96,186 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'djangoproj.wsgi.application'
+ASGI_APPLICATION = 'djangoproj.asgi.application'
+
+# "wsgi" (gunicorn sync workers) or "asgi" (gunicorn with uvicorn workers,
+# see gunicorn.conf.py). Under ASGI the views that call downstream services
+# are served by their async variants.
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+ASYNC_VIEWS = SERVER_MODE == 'asgi'
+
+# Where `get_inventory` searches: "remote" (the searchcars service) or
+# "local" (the InventoryCar table, filled by `manage.py sync_inventory`).
+INVENTORY_SOURCE = os.getenv('INVENTORY_SOURCE', 'remote')
+
+# How djangoapp encodes and decodes JSON: "auto" (orjson when installed),
+# "orjson" or "stdlib" (see djangoapp/jsoncodec.py).
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+
+# Seconds the dealer page endpoint waits for each of its parts
+DEALER_PAGE_TIMEOUT = float(os.getenv('DEALER_PAGE_TIMEOUT', '5'))
+
+# Seconds one request may spend in total waiting on downstream services
+# (backend, searchcars, sentiment analyzer); calls made after it ran out fail
+# fast. Circuit breakers are tuned in djangoapp/restapis.py.
+DOWNSTREAM_TIME_BUDGET = float(os.getenv('DOWNSTREAM_TIME_BUDGET', '8'))
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_PROFILE selects the database:
+#   sqlite (default): db.sqlite3 (or SQLITE_PATH) in WAL mode, so readers do
+#       not wait for writers, with connections kept for DB_CONN_MAX_AGE
+#       seconds. Writes take the lock when their transaction starts
+#       (IMMEDIATE) and wait up to DB_BUSY_TIMEOUT for it.
+#   postgres: POSTGRES_* settings, with a connection pool per worker
+#       (requires the "psycopg[pool]" package).
+# djangoapp/checks.py verifies that the profile took effect; entrypoint.sh
+# runs it on startup.
+
+DB_PROFILE = os.getenv('DB_PROFILE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+DB_BUSY_TIMEOUT = int(os.getenv('DB_BUSY_TIMEOUT', '20'))
+
+if DB_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'dealership'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            # Pooled connections are returned to the pool after each
+            # request, so they are not also kept with CONN_MAX_AGE
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+                    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+                    'timeout': DB_BUSY_TIMEOUT,
+                },
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': DB_BUSY_TIMEOUT,
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA mmap_size=134217728;'
+                ),
+            },
+        }
+    }
+
+# Caches
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# "sentiment" is the persistent tier of the sentiment result cache in
+# djangoapp/restapis.py; enable it with the env `sentiment_cache_alias`.
+# "shared" is visible to every worker on the host and carries cache
+# invalidations between them (e.g. of the dealer listings).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sentiment': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('SENTIMENT_CACHE_DIR',
+                              os.path.join(BASE_DIR, 'cache', 'sentiment')),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('SHARED_CACHE_DIR',
+                              os.path.join(BASE_DIR, 'cache', 'shared')),
+        'TIMEOUT': None,
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('SESSION_CACHE_DIR',
+                              os.path.join(BASE_DIR, 'cache', 'sessions')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
+# Sessions
+# https://docs.djangoproject.com/en/3.2/topics/http/sessions/
+# SESSION_MODE selects where sessions live:
+#   db (default): in the django_session table.
+#   signed_cookies: in a signed cookie; login and registration write
+#       nothing to the database for the session. Logout only clears the
+#       cookie, so a copied cookie stays valid until it expires.
+#   cache: in the "sessions" cache, shared by the workers of a host.
+#   cached_db: in the "sessions" cache, written through to the database.
+
+SESSION_MODE = os.getenv('SESSION_MODE', 'db')
+SESSION_ENGINE = 'django.contrib.sessions.backends.' + SESSION_MODE
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Whether each login also writes the user's last_login time (an UPDATE of
+# auth_user), shown in the admin. Set UPDATE_LAST_LOGIN=false, with
+# SESSION_MODE=signed_cookies, to keep login off the database write path.
+UPDATE_LAST_LOGIN = os.getenv('UPDATE_LAST_LOGIN', 'true') == 'true'
+
+# Logging
+# https://docs.djangoproject.com/en/3.2/topics/logging/
+# djangoapp logs JSON lines to stdout from a background thread (see
+# djangoapp/log.py). DEBUG records are sampled, one in
+# LOG_DEBUG_SAMPLE_RATE per call site; payload dumps are only written with
+# LOG_PAYLOAD_LEVEL=DEBUG.
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'djangoapp.log.JsonFormatter',
+        },
+    },
+    'filters': {
+        'sample_debug': {
+            '()': 'djangoapp.log.SampleFilter',
+            'rate': int(os.getenv('LOG_DEBUG_SAMPLE_RATE', '100')),
+        },
+    },
+    'handlers': {
+        'queue': {
+            'class': 'djangoapp.log.QueuedHandler',
+            'formatter': 'json',
+            'filters': ['sample_debug'],
+            'maxsize': int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+        },
+    },
+    'loggers': {
+        'djangoapp': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'djangoapp.payloads': {
+            'level': os.getenv('LOG_PAYLOAD_LEVEL', 'WARNING'),
+        },
+    },
 }
 
 AUTH_PASSWORD_VALIDATORS = [
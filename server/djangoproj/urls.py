@@ -18,6 +18,7 @@ from django.urls import path, include
 from django.views.generic import TemplateView
 from django.conf.urls.static import static
 from django.conf import settings
+from djangoapp.views import get_metrics
 
 urlpatterns = [
     path('about/', TemplateView.as_view(template_name="About.html")),
@@ -31,6 +32,7 @@ urlpatterns = [
          TemplateView.as_view(template_name="index.html")),
     path('admin/', admin.site.urls),
     path('djangoapp/', include('djangoapp.urls')),
+    path('metrics', get_metrics, name='metrics'),
     path('', TemplateView.as_view(template_name="Home.html")),
     path('searchcars/<int:dealer_id>',
          TemplateView.as_view(template_name="index.html")),
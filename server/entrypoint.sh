@@ -4,5 +4,7 @@
 echo "Making migrations and migrating the database. "
 python manage.py makemigrations --noinput
 python manage.py migrate --noinput
+# Confirm that the database profile (DB_PROFILE) took effect
+python manage.py check --database default
 python manage.py collectstatic --noinput
 exec "$@"
\ No newline at end of file
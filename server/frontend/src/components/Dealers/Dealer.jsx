@@ -20,30 +20,22 @@ const Dealer = () => {
   let root_url = curr_url.substring(0,curr_url.indexOf("dealer"));
   let params = useParams();
   let id =params.id;
-  let dealer_url = root_url+`djangoapp/dealer/${id}`;
-  let reviews_url = root_url+`djangoapp/reviews/dealer/${id}`;
+  // Dealer details and reviews come from one aggregated request
+  let dealer_page_url = root_url+`djangoapp/dealer_page/${id}`;
   let post_review = root_url+`postreview/${id}`;
   
-  const get_dealer = async ()=>{
-    const res = await fetch(dealer_url, {
+  const get_dealer_page = async ()=>{
+    const res = await fetch(dealer_page_url, {
       method: "GET"
     });
     const retobj = await res.json();
     
     if(retobj.status === 200) {
-      let dealerobjs = Array.from(retobj.dealer)
-      setDealer(dealerobjs[0])
-    }
-  }
-
-  const get_reviews = async ()=>{
-    const res = await fetch(reviews_url, {
-      method: "GET"
-    });
-    const retobj = await res.json();
-    
-    if(retobj.status === 200) {
-      if(retobj.reviews.length > 0){
+      if(retobj.dealer) {
+        let dealerobjs = Array.from(retobj.dealer)
+        setDealer(dealerobjs[0])
+      }
+      if(retobj.reviews && retobj.reviews.length > 0){
         setReviews(retobj.reviews)
       } else {
         setUnreviewed(true);
@@ -57,8 +49,7 @@ const Dealer = () => {
   }
 
   useEffect(() => {
-    get_dealer();
-    get_reviews();
+    get_dealer_page();
     if(sessionStorage.getItem("username")) {
       setPostReview(<a href={post_review}><img src={review_icon} style={{width:'10%',marginLeft:'10px',marginTop:'10px'}} alt='Post Review'/></a>)
 
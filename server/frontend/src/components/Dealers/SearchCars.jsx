@@ -51,154 +51,17 @@ const SearchCars = () => {
     }
   }
 
-  const setCarsmatchingCriteria = async(matching_cars)=>{
-    let cars = Array.from(matching_cars)
-    console.log("Number of matching cars "+cars.length);
-
-    let makeIdx = document.getElementById('make').selectedIndex;
-    let modelIdx = document.getElementById('model').selectedIndex;
-    let yearIdx = document.getElementById('year').selectedIndex;
-    let mileageIdx = document.getElementById('mileage').selectedIndex;
-    let priceIdx = document.getElementById('price').selectedIndex;
-
-    if(makeIdx !== 0) {
-      let currmake = document.getElementById('make').value;
-      cars = cars.filter(car => car.make === currmake);
-    }
-    if(modelIdx !== 0) {
-      let currmodel = document.getElementById('model').value;
-      cars = cars.filter(car => car.model === currmodel);
-      if(cars.length !== 0) {
-        document.getElementById('make').value = cars[0].make;
-      }
-    }
-
-    if(yearIdx !== 0) {
-      let curryear = document.getElementById('year').value;
-      cars = cars.filter(car => car.year >= curryear);
-      if(cars.length !== 0) {
-        document.getElementById('make').value = cars[0].make;
-      }
-    }
-
-    if(mileageIdx !== 0) {
-      let currmileage = parseInt(document.getElementById('mileage').value);
-      if(currmileage === 50000) {
-        cars = cars.filter(car => car.mileage <= currmileage);
-      } else if (currmileage === 100000){
-        cars = cars.filter(car => car.mileage <= currmileage && car.mileage > 50000);
-      } else if (currmileage === 150000){
-        cars = cars.filter(car => car.mileage <= currmileage && car.mileage > 100000);
-      } else if (currmileage === 200000){
-        cars = cars.filter(car => car.mileage <= currmileage && car.mileage > 150000);
-      } else {
-        cars = cars.filter(car => car.mileage > 200000);
-      }
-    }
-
-    if(priceIdx !== 0) {
-      let currprice = parseInt(document.getElementById('price').value);
-      if(currprice === 20000) {
-        cars = cars.filter(car => car.price <= currprice);
-      } else if (currprice === 40000){
-        cars = cars.filter(car => car.price <= currprice && car.price > 20000);
-      } else if (currprice === 60000){
-        cars = cars.filter(car => car.price <= currprice && car.price > 40000);
-      } else if (currprice === 80000){
-        cars = cars.filter(car => car.price <= currprice && car.price > 60000);
-      } else {
-        cars = cars.filter(car => car.price > 80000);
+  // All selected criteria are sent together and filtered by the server
+  const searchCars = async ()=> {
+    const params = new URLSearchParams();
+    ['make', 'model', 'year', 'mileage', 'price'].forEach((criterion)=>{
+      const select = document.getElementById(criterion);
+      if(select.selectedIndex !== 0 && select.value !== 'all') {
+        params.append(criterion, select.value);
       }
-    }
-
-    if(cars.length === 0) {
-      setMessage("No cars found matching criteria");
-    }
-    setCars(cars);
-  }
-
-  
-  let SearchCarsByMake = async ()=> {
-    let make = document.getElementById("make").value;
-    dealer_url = dealer_url + "?make="+make;
-
-    const res = await fetch(dealer_url, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-        }})
-
-      const retobj = await res.json();
-      
-      if(retobj.status === 200) {
-        setCarsmatchingCriteria(retobj.cars);
-      }
-  }
-
-   let SearchCarsByModel = async ()=> {
-    let model = document.getElementById("model").value;
-    dealer_url = dealer_url + "?model="+model;
-
-    const res = await fetch(dealer_url, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-        }})
-
-      const retobj = await res.json();
-      
-      if(retobj.status === 200) {
-        setCarsmatchingCriteria(retobj.cars);
-      }
-  }
-
-  let SearchCarsByYear = async ()=> {
-    let year = document.getElementById("year").value;
-    if (year !== "all") {
-      dealer_url = dealer_url + "?year="+year;
-    }
-
-    const res = await fetch(dealer_url, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-        }})
-
-      const retobj = await res.json();
-      
-      if(retobj.status === 200) {
-        setCarsmatchingCriteria(retobj.cars);
-      }
-  }
-
-  let SearchCarsByMileage = async ()=> {
-    
-    let mileage = document.getElementById("mileage").value;
-    if (mileage !== "all") {
-      dealer_url = dealer_url + "?mileage="+mileage;
-    }    
-
-    const res = await fetch(dealer_url, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-        }})
-
-      const retobj = await res.json();
-      
-      if(retobj.status === 200) {
-        setCarsmatchingCriteria(retobj.cars);
-      }
-  }
-
+    });
 
-  let SearchCarsByPrice = async ()=> {
-    let price = document.getElementById("price").value;
-    if(price !== "all") {
-      dealer_url = dealer_url + "?price="+price;
-    }
-    
-    const res = await fetch(dealer_url, {
+    const res = await fetch(dealer_url+"?"+params.toString(), {
         method: 'GET',
         headers: {
           'Content-Type': 'application/json',
@@ -207,7 +70,11 @@ const SearchCars = () => {
       const retobj = await res.json();
       
       if(retobj.status === 200) {
-        setCarsmatchingCriteria(retobj.cars);
+        let cars = Array.from(retobj.cars)
+        if(cars.length === 0) {
+          setMessage("No cars found matching criteria");
+        }
+        setCars(cars);
       }
   }
 
@@ -232,7 +99,7 @@ const SearchCars = () => {
       <h1 style={{ marginBottom: '20px'}}>Cars at {dealer.full_name}</h1>
       <div>
       <span style={{ marginLeft: '10px', paddingLeft: '10px'}}>Make</span>
-      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="make" id="make" onChange={SearchCarsByMake}>
+      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="make" id="make" onChange={searchCars}>
         {makes.length === 0 ? (
           <option value=''>No data found</option>
         ):(
@@ -248,7 +115,7 @@ const SearchCars = () => {
         }
       </select>
       <span style={{ marginLeft: '10px', paddingLeft: '10px'}}>Model</span>
-      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="model" id="model" onChange={SearchCarsByModel}>
+      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="model" id="model" onChange={searchCars}>
       {models.length === 0 ? (
         <option value=''>No data found</option>
       ) : (
@@ -263,7 +130,7 @@ const SearchCars = () => {
       )}      
       </select>
       <span style={{ marginLeft: '10px', paddingLeft: '10px'}}>Year</span>
-      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="year" id="year" onChange={SearchCarsByYear}>
+      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="year" id="year" onChange={searchCars}>
           <option selected value='all'> -- All -- </option>
           <option value='2024'>2024 or newer</option>
           <option value='2023'>2023 or newer</option>
@@ -272,7 +139,7 @@ const SearchCars = () => {
           <option value='2020'>2020 or newer</option>
       </select>
       <span style={{ marginLeft: '10px', paddingLeft: '10px'}}>Mileage</span>
-      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="mileage" id="mileage" onChange={SearchCarsByMileage}>
+      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="mileage" id="mileage" onChange={searchCars}>
         <option selected value='all'> -- All -- </option>
           <option value='50000'>Under 50000</option>
           <option value='100000'>50000 - 100000</option>
@@ -281,7 +148,7 @@ const SearchCars = () => {
           <option value='200001'>Over 200000</option>
       </select>
       <span style={{ marginLeft: '10px', paddingLeft: '10px'}}>Price</span>
-      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="price" id="price" onChange={SearchCarsByPrice}>
+      <select style={{ marginLeft: '10px', marginRight: '10px' ,paddingLeft: '10px', borderRadius :'10px'}} name="price" id="price" onChange={searchCars}>
           <option selected value='all'> -- All -- </option>
           <option value='20000'>Under 20000</option>
           <option value='40000'>20000 - 40000</option>
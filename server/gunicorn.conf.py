@@ -0,0 +1,41 @@
+""" Gunicorn configuration for the Django project.
+
+    SERVER_MODE selects how the project is served:
+        wsgi (default): sync workers running djangoproj.wsgi.
+        asgi: uvicorn workers running djangoproj.asgi, where the async
+              dealer views let one worker serve many slow downstream
+              requests at once.
+
+    Prometheus metrics are written by every worker to files in
+    PROMETHEUS_MULTIPROC_DIR, which is emptied when gunicorn starts, so that
+    `/metrics` on any worker reports the whole server.
+"""
+
+import os
+import shutil
+
+server_mode = os.getenv('SERVER_MODE', 'wsgi')
+
+bind = os.getenv('GUNICORN_BIND', ':8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '3'))
+
+if server_mode == 'asgi':
+    wsgi_app = 'djangoproj.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'djangoproj.wsgi:application'
+    worker_class = 'sync'
+
+# Set before the workers are forked, so that prometheus_client picks it up
+prometheus_multiproc_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', '/tmp/djangoproj-metrics')
+
+
+def on_starting(server):
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)